@@ -0,0 +1 @@
+"""ZenFeed multi-agent system."""
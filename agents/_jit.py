@@ -0,0 +1,44 @@
+"""
+Conditional JIT Compilation
+
+Numba is optional: bulk-scoring servers install it, the extension
+deployment may not. Kernels decorated with ``cond_jit`` are compiled
+with ``njit(cache=True)`` when Numba is importable and run as plain
+Python otherwise.
+"""
+
+import warnings
+
+try:
+    from numba import njit
+    HAVE_NUMBA = True
+except ImportError:
+    HAVE_NUMBA = False
+
+_warned = False
+
+
+def cond_jit(*args, **kwargs):
+    """
+    Apply ``numba.njit`` if available, otherwise leave the function as is.
+
+    Positional arguments (e.g. an explicit signature for eager compilation)
+    and keyword options are passed through to ``njit``. Compiled code is
+    cached on disk next to the source, so restarts skip recompilation.
+
+    Returns:
+        Decorator for a numeric kernel
+    """
+    def decorator(func):
+        global _warned
+        if HAVE_NUMBA:
+            return njit(*args, cache=True, **kwargs)(func)
+        if not _warned:
+            warnings.warn(
+                "numba is not installed; numeric kernels run as plain Python",
+                RuntimeWarning,
+                stacklevel=2
+            )
+            _warned = True
+        return func
+    return decorator
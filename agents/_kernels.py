@@ -0,0 +1,103 @@
+"""
+Numeric Kernels for ZenFeed Agents
+
+Scalar scoring cores shared by ASA and BMA, plus the history reduction
+used by the orchestrator's demo BMA. Compiled with Numba when it is
+installed; otherwise the same functions run as plain Python.
+"""
+
+from agents._jit import cond_jit
+
+
+# repeat_count is float64 so fractional counts compare exactly as in
+# plain Python (an int64 signature would truncate 2.7 to 2)
+@cond_jit("int64(float64, float64, boolean, boolean)")
+def behavioral_score(session_minutes, repeat_count, late_night, user_searched):
+    """Score contribution from behavioral signals (never negative)."""
+    score = 0
+
+    # Session duration (minutes in last hour)
+    if session_minutes > 60:
+        score += 20
+    elif session_minutes > 30:
+        score += 15
+    elif session_minutes > 15:
+        score += 10
+    elif session_minutes > 5:
+        score += 5
+
+    # Repeat viewing pattern
+    if repeat_count > 5:
+        score += 20
+    elif repeat_count > 2:
+        score += 15
+    elif repeat_count > 0:
+        score += 10
+
+    # Late night / early morning
+    if late_night:
+        score += 10
+
+    # User explicitly searched (lower risk)
+    if user_searched:
+        score -= 5
+
+    return max(0, score)
+
+
+@cond_jit("int64(int64, int64, int64)")
+def compute_addiction(base_score, trigger_score, behavioral):
+    """Combine score components into the Addiction Index (capped at 100)."""
+    return min(100, base_score + trigger_score + behavioral)
+
+
+@cond_jit("int64(float64, int64, float64, int64)")
+def detect_trend(recent_sum, recent_len, older_sum, older_len):
+    """Compare recent vs older averages: 1 increasing, -1 decreasing, 0 stable."""
+    if recent_len == 0 or older_len == 0:
+        return 0
+
+    recent_avg = recent_sum / recent_len
+    older_avg = older_sum / older_len
+
+    if recent_avg > older_avg * 1.25:
+        return 1
+    elif recent_avg < older_avg * 0.75:
+        return -1
+    return 0
+
+
+@cond_jit("int64(int64, int64)")
+def update_late_night(late_night_count, hour):
+    """Increment the late-night counter for views between 23:00 and 06:00."""
+    if hour >= 23 or hour < 6:
+        return late_night_count + 1
+    return late_night_count
+
+
+@cond_jit("Tuple((float64, int64))(float64[::1], float64)", fastmath=True)
+def history_stats(history, limit):
+    """Mean of a daily-minutes history and the trailing run of days above limit."""
+    n = len(history)
+    if n == 0:
+        return 0.0, 0
+
+    total = 0.0
+    for i in range(n):
+        total += history[i]
+
+    streak = 0
+    for i in range(n - 1, -1, -1):
+        if history[i] <= limit:
+            break
+        streak += 1
+
+    return total / n, streak
+
+
+@cond_jit("UniTuple(int64, 2)(int64, int64, float64, float64, boolean, boolean)")
+def score_components(base_score, trigger_score, session_minutes, repeat_count,
+                     late_night, user_searched):
+    """Behavioral score and final Addiction Index in one call: (behavioral, index)."""
+    behavioral = behavioral_score(session_minutes, repeat_count, late_night, user_searched)
+    return behavioral, compute_addiction(base_score, trigger_score, behavioral)
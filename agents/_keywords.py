@@ -0,0 +1,92 @@
+"""
+Title Keyword Matching for ZenFeed Agents
+
+All keyword families used by FIA title indicators and CCA heuristic
+triggers are compiled into one pattern, so a title is scanned once
+instead of once per keyword.
+"""
+
+import re
+from functools import lru_cache
+from typing import FrozenSet
+
+# Keyword families (FIA title indicators)
+ADDICTIVE_KEYWORDS = (
+    "try not to laugh", "compilation", "meme", "funny",
+    "best of", "fails", "reaction", "tiktok", "viral"
+)
+EDUCATIONAL_KEYWORDS = (
+    "tutorial", "learn", "study", "lecture", "course",
+    "guide", "how to", "explained", "documentary"
+)
+CLICKBAIT_KEYWORDS = (
+    "you won't believe", "shocking", "must see", "gone wrong",
+    "insane", "crazy", "unbelievable"
+)
+
+# Keyword families (CCA heuristic triggers)
+COMPILATION_KEYWORDS = ("compilation", "best of")
+HUMOR_KEYWORDS = ("funny", "meme", "laugh")
+SHOCK_KEYWORDS = ("shocking", "insane", "crazy")
+FOMO_KEYWORDS = ("viral", "trending", "must see")
+
+KEYWORD_FAMILIES = {
+    "addictive": ADDICTIVE_KEYWORDS,
+    "educational": EDUCATIONAL_KEYWORDS,
+    "clickbait": CLICKBAIT_KEYWORDS,
+    "compilation": COMPILATION_KEYWORDS,
+    "humor": HUMOR_KEYWORDS,
+    "shock": SHOCK_KEYWORDS,
+    "FOMO": FOMO_KEYWORDS
+}
+
+# Per-family patterns for vectorized (whole-column) matching
+KEYWORD_PATTERNS = {
+    family: re.compile("|".join(map(re.escape, keywords)))
+    for family, keywords in KEYWORD_FAMILIES.items()
+}
+
+
+def _build_matcher():
+    """Compile the combined pattern and the keyword -> families table."""
+    families = {}
+    for family, keywords in KEYWORD_FAMILIES.items():
+        for kw in keywords:
+            families.setdefault(kw, set()).add(family)
+    
+    # A match of a longer keyword also implies every keyword it contains
+    # (e.g. "try not to laugh" -> "laugh")
+    table = {
+        kw: frozenset().union(*(fams for other, fams in families.items() if other in kw))
+        for kw in families
+    }
+    
+    # Zero-width lookahead tries every start position, so overlapping
+    # keywords are all seen; longest alternatives go first so the one
+    # captured at a position contains any shorter keyword starting there
+    alternation = "|".join(map(re.escape, sorted(families, key=len, reverse=True)))
+    return re.compile(f"(?=({alternation}))"), table
+
+
+_KEYWORD_RE, _KEYWORD_TABLE = _build_matcher()
+
+
+@lru_cache(maxsize=1024)
+def match_keyword_families(text_lower: str) -> FrozenSet[str]:
+    """
+    Find which keyword families occur in a lowercased title.
+    
+    Equivalent to checking ``kw in text_lower`` for every keyword, in one
+    pass over the text. Results are memoized, so FIA's indicators and the
+    CCA heuristic share a single scan of each title.
+    
+    Args:
+        text_lower: Lowercased text to scan
+    
+    Returns:
+        Names of the matched families
+    """
+    found = frozenset()
+    for match in _KEYWORD_RE.finditer(text_lower):
+        found |= _KEYWORD_TABLE[match.group(1)]
+    return found
@@ -0,0 +1,46 @@
+"""
+Non-blocking Log Output for ZenFeed Agents
+
+Agent and orchestrator handlers only enqueue records; one background
+listener thread writes them to stderr. Stream I/O therefore never runs on
+the event loop or in an agent's hot path.
+"""
+
+import atexit
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+
+_log_queue = None
+
+
+def _start_listener() -> queue.SimpleQueue:
+    """Start the shared stderr listener (once per process)."""
+    global _log_queue
+    if _log_queue is None:
+        _log_queue = queue.SimpleQueue()
+        stream = logging.StreamHandler()
+        # Records arrive already formatted by the enqueuing handler
+        stream.setFormatter(logging.Formatter("%(message)s"))
+        listener = QueueListener(_log_queue, stream)
+        listener.start()
+        atexit.register(listener.stop)
+    return _log_queue
+
+
+def queue_handler(formatter: logging.Formatter) -> QueueHandler:
+    """
+    Create a handler that formats records and hands them to the listener.
+    
+    Formatting happens in the calling thread (only for records that pass
+    the level check); writing happens on the listener thread.
+    
+    Args:
+        formatter: Formatter applied before the record is enqueued
+    
+    Returns:
+        Handler to attach to a logger
+    """
+    handler = QueueHandler(_start_listener())
+    handler.setFormatter(formatter)
+    return handler
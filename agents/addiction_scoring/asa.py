@@ -5,13 +5,82 @@ Calculates addiction risk index (0-100) based on content classification
 and behavioral signals.
 """
 
-import sys
-import os
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import logging
+import numbers
 
-from base_agent import BaseAgent
+from agents.base_agent import BaseAgent, _response_timestamp
+from agents._kernels import behavioral_score as _behavioral_score, score_components
 from typing import Dict, Any
 from datetime import datetime
+from bisect import bisect_right
+
+
+# Category base scores
+_CATEGORY_SCORES = {
+    "harmful": 90,
+    "addictive": 70,
+    "entertainment": 40,
+    "neutral": 20,
+    "productive": 10,
+    "educational": 5
+}
+
+# Trigger weights
+_TRIGGER_WEIGHTS = {
+    "short_duration": 10,
+    "compilation": 10,
+    "humor": 5,
+    "shock": 8,
+    "FOMO": 12,
+    "clickbait": 7,
+    "repetition": 15
+}
+
+# Trigger bitmask lookup: one bit per known trigger, and a table holding
+# the summed weight for every combination of bits
+_TRIGGER_BIT = {name: 1 << i for i, name in enumerate(_TRIGGER_WEIGHTS)}
+_TRIGGER_LUT = tuple(
+    sum(weight for name, weight in _TRIGGER_WEIGHTS.items() if mask & _TRIGGER_BIT[name])
+    for mask in range(1 << len(_TRIGGER_BIT))
+)
+_HIGH_TRIGGER_MASK = sum(
+    _TRIGGER_BIT[name] for name, weight in _TRIGGER_WEIGHTS.items() if weight >= 10
+)
+
+# Categories reported as a major factor
+_FLAGGED_CATEGORIES = frozenset(("addictive", "harmful"))
+
+# Risk level / action steps (applies when index reaches threshold),
+# expanded into lookup tables over every possible index (0-100)
+_RISK_THRESHOLDS = (31, 61, 81)
+_RISK_LEVELS = ("low", "moderate", "high", "critical")
+_ACTION_THRESHOLDS = (30, 61, 81, 91)
+_ACTIONS = ("none", "nudge", "blur", "replace", "lockout")
+
+_RISK_BY_INDEX = tuple(
+    _RISK_LEVELS[bisect_right(_RISK_THRESHOLDS, i)] for i in range(101)
+)
+_ACTION_BY_INDEX = tuple(
+    _ACTIONS[bisect_right(_ACTION_THRESHOLDS, i)] for i in range(101)
+)
+
+# Precomputed results for trivially low-risk items (benign category, no
+# triggers, no behavioral signal): the index is just the base score.
+# Shared across responses, so treat them as read-only.
+_LOW_RISK_TEMPLATES = {
+    category: {
+        "addiction_index": _CATEGORY_SCORES[category],
+        "risk_level": "low",
+        "recommended_action": "none",
+        "major_factors": ["Low-risk content"],
+        "breakdown": {
+            "base_score": _CATEGORY_SCORES[category],
+            "trigger_score": 0,
+            "behavioral_score": 0
+        }
+    }
+    for category in ("educational", "productive")
+}
 
 
 class AddictionScoringAgent(BaseAgent):
@@ -25,34 +94,30 @@ class AddictionScoringAgent(BaseAgent):
     - Identify major contributing factors
     """
     
+    __slots__ = (
+        "category_scores", "trigger_weights",
+        "_trigger_bit", "_trigger_lut", "_high_trigger_mask", "_low_risk_templates"
+    )
+    
     def __init__(self, name: str):
         super().__init__(name)
         
-        # Category base scores
-        self.category_scores = {
-            "harmful": 90,
-            "addictive": 70,
-            "entertainment": 40,
-            "neutral": 20,
-            "productive": 10,
-            "educational": 5
-        }
-        
-        # Trigger weights
-        self.trigger_weights = {
-            "short_duration": 10,
-            "compilation": 10,
-            "humor": 5,
-            "shock": 8,
-            "FOMO": 12,
-            "clickbait": 7,
-            "repetition": 15
-        }
+        # Shared, module-level scoring tables (built once at import)
+        self.category_scores = _CATEGORY_SCORES
+        self.trigger_weights = _TRIGGER_WEIGHTS
+        self._trigger_bit = _TRIGGER_BIT
+        self._trigger_lut = _TRIGGER_LUT
+        self._high_trigger_mask = _HIGH_TRIGGER_MASK
+        self._low_risk_templates = _LOW_RISK_TEMPLATES
     
     def process(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Calculate addiction score.
         
+        Each distinct trigger counts once: repeats of a known trigger share
+        its bit in the lookup mask, and repeats of an unknown trigger (worth
+        5) are de-duplicated the same way.
+        
         Args:
             data: Contains classification results and behavioral context
             
@@ -67,111 +132,125 @@ class AddictionScoringAgent(BaseAgent):
             if isinstance(classification, dict) and "data" in classification:
                 classification = classification["data"]
             
-            # Extract behavioral context
+            # Extract behavioral context into locals once
             context = data.get("context", {})
+            session_minutes = context.get("session_minutes", 0)
+            repeat_count = context.get("repeat_count", 0)
+            time_of_day = context.get("time_of_day", "")
+            user_searched = context.get("user_searched", False)
+            # The compiled kernels only accept numbers; reject anything else
+            # up front with the same error whether or not numba is installed
+            for field, value in (("session_minutes", session_minutes), ("repeat_count", repeat_count)):
+                if not isinstance(value, numbers.Real):
+                    raise TypeError(f"context.{field} must be a number, got {type(value).__name__}")
             
-            # Calculate base score from category
             category = classification.get("category", "neutral")
+            triggers = classification.get("triggers", [])
+            
+            # Fast path: benign content with no triggers or behavioral signal
+            if (
+                category in self._low_risk_templates
+                and not triggers
+                and session_minutes < 5
+                and repeat_count == 0
+                and not self._parse_late_night(time_of_day)
+            ):
+                return self.create_response("success", self._low_risk_templates[category])
+            
+            # Calculate base score from category
             base_score = self.category_scores.get(category, 20)
             
             # Add trigger contributions
-            triggers = classification.get("triggers", [])
-            trigger_score = sum(self.trigger_weights.get(t, 5) for t in triggers)
+            trigger_mask = 0
+            unknown_triggers = set()
+            for t in triggers:
+                bit = self._trigger_bit.get(t, 0)
+                if bit:
+                    trigger_mask |= bit
+                else:
+                    unknown_triggers.add(t)
+            trigger_score = self._trigger_lut[trigger_mask] + 5 * len(unknown_triggers)
             
-            # Add behavioral factors
-            behavioral_score = self._calculate_behavioral_score(context)
+            # Derive behavioral flags once for scoring and factor reporting
+            late_night = self._parse_late_night(time_of_day)
             
-            # Calculate final index (capped at 100)
-            addiction_index = min(100, base_score + trigger_score + behavioral_score)
-            
-            # Determine risk level
-            risk_level = self._determine_risk_level(addiction_index)
+            # Add behavioral factors and calculate the final index (capped
+            # at 100) in one compiled call
+            behavioral_score, addiction_index = score_components(
+                base_score, trigger_score, session_minutes, repeat_count,
+                late_night, bool(user_searched)
+            )
             
-            # Recommend action
-            recommended_action = self._recommend_action(addiction_index, risk_level)
+            # Determine risk level and recommended action (table lookups)
+            risk_level = _RISK_BY_INDEX[addiction_index]
+            recommended_action = _ACTION_BY_INDEX[addiction_index]
             
             # Identify major factors
             major_factors = self._identify_major_factors(
-                category, triggers, context, behavioral_score
+                category, triggers, trigger_mask, behavioral_score,
+                session_minutes > 30, repeat_count > 2, late_night
             )
             
-            result = {
-                "addiction_index": addiction_index,
-                "risk_level": risk_level,
-                "recommended_action": recommended_action,
-                "major_factors": major_factors,
-                "breakdown": {
-                    "base_score": base_score,
-                    "trigger_score": trigger_score,
-                    "behavioral_score": behavioral_score
+            if self.logger.isEnabledFor(logging.INFO):
+                self.logger.info("Addiction Index: %s/100 (%s risk)", addiction_index, risk_level)
+            
+            # Success response built in one literal (create_response inlined)
+            return {
+                "agent": self.name,
+                "status": "success",
+                "timestamp": _response_timestamp(),
+                "data": {
+                    "addiction_index": addiction_index,
+                    "risk_level": risk_level,
+                    "recommended_action": recommended_action,
+                    "major_factors": major_factors,
+                    "breakdown": {
+                        "base_score": base_score,
+                        "trigger_score": trigger_score,
+                        "behavioral_score": behavioral_score
+                    }
                 }
             }
             
-            self.log(f"Addiction Index: {addiction_index}/100 ({risk_level} risk)")
-            
-            return self.create_response("success", result)
-            
         except Exception as e:
             return self.handle_error(e, "Addiction scoring")
     
-    def _calculate_behavioral_score(self, context: Dict[str, Any]) -> int:
+    def _parse_late_night(self, time_of_day: str) -> bool:
+        """Check whether an "HH:MM" time falls in late night / early morning."""
+        if not time_of_day:
+            return False
+        try:
+            hour = int(time_of_day.split(":")[0])
+            return 23 <= hour or hour < 6
+        except:
+            return False
+    
+    def _calculate_behavioral_score(
+        self,
+        session_minutes: float,
+        repeat_count: int,
+        late_night: bool,
+        user_searched: bool
+    ) -> int:
         """
         Calculate score contribution from behavioral signals.
         
         Args:
-            context: Behavioral context (session time, repeat count, etc.)
+            session_minutes: Minutes watched in the last hour
+            repeat_count: Repeat views of similar content
+            late_night: Whether the view happens late at night (higher risk)
+            user_searched: Whether the user explicitly searched (lower risk)
             
         Returns:
             Behavioral score contribution
         """
-        score = 0
-        
-        # Session duration (minutes in last hour)
-        session_minutes = context.get("session_minutes", 0)
-        if session_minutes > 60:
-            score += 20
-        elif session_minutes > 30:
-            score += 15
-        elif session_minutes > 15:
-            score += 10
-        elif session_minutes > 5:
-            score += 5
-        
-        # Repeat viewing pattern
-        repeat_count = context.get("repeat_count", 0)
-        if repeat_count > 5:
-            score += 20
-        elif repeat_count > 2:
-            score += 15
-        elif repeat_count > 0:
-            score += 10
-        
-        # Time of day (late night = higher risk)
-        time_of_day = context.get("time_of_day", "")
-        if time_of_day:
-            try:
-                hour = int(time_of_day.split(":")[0])
-                if 23 <= hour or hour < 6:  # Late night / early morning
-                    score += 10
-            except:
-                pass
-        
-        # User explicitly searched (lower risk)
-        if context.get("user_searched", False):
-            score -= 5
-        
-        return max(0, score)
+        return _behavioral_score(
+            session_minutes, repeat_count, late_night, bool(user_searched)
+        )
     
     def _determine_risk_level(self, addiction_index: int) -> str:
         """Determine risk level from addiction index."""
-        if addiction_index >= 81:
-            return "critical"
-        elif addiction_index >= 61:
-            return "high"
-        elif addiction_index >= 31:
-            return "moderate"
-        else:
-            return "low"
+        return _RISK_BY_INDEX[addiction_index]
     
     def _recommend_action(self, addiction_index: int, risk_level: str) -> str:
         """
@@ -184,23 +263,17 @@ class AddictionScoringAgent(BaseAgent):
         Returns:
             Recommended action type
         """
-        if addiction_index >= 91:
-            return "lockout"
-        elif addiction_index >= 81:
-            return "replace"
-        elif addiction_index >= 61:
-            return "blur"
-        elif addiction_index >= 30:
-            return "nudge"
-        else:
-            return "none"
+        return _ACTION_BY_INDEX[addiction_index]
     
     def _identify_major_factors(
         self,
         category: str,
         triggers: list,
-        context: Dict[str, Any],
-        behavioral_score: int
+        trigger_mask: int,
+        behavioral_score: int,
+        long_session: bool,
+        repeat_viewing: bool,
+        late_night: bool
     ) -> list:
         """
         Identify major contributing factors to addiction score.
@@ -211,29 +284,25 @@ class AddictionScoringAgent(BaseAgent):
         factors = []
         
         # Category factor
-        if category in ["addictive", "harmful"]:
+        if category in _FLAGGED_CATEGORIES:
             factors.append(f"Content category: {category}")
         
         # Trigger factors
-        high_weight_triggers = [t for t in triggers if self.trigger_weights.get(t, 0) >= 10]
-        if high_weight_triggers:
+        if trigger_mask & self._high_trigger_mask:
+            high_weight_triggers = [
+                t for t in triggers
+                if self._trigger_bit.get(t, 0) & self._high_trigger_mask
+            ]
             factors.append(f"High-risk triggers: {', '.join(high_weight_triggers)}")
         
         # Behavioral factors
         if behavioral_score >= 15:
-            if context.get("session_minutes", 0) > 30:
+            if long_session:
                 factors.append("Extended session duration")
-            if context.get("repeat_count", 0) > 2:
+            if repeat_viewing:
                 factors.append("Repeated viewing pattern")
-            
-            time_of_day = context.get("time_of_day", "")
-            if time_of_day:
-                try:
-                    hour = int(time_of_day.split(":")[0])
-                    if 23 <= hour or hour < 6:
-                        factors.append("Late-night usage")
-                except:
-                    pass
+            if late_night:
+                factors.append("Late-night usage")
         
         return factors if factors else ["Low-risk content"]
 
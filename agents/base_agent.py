@@ -6,9 +6,27 @@ and communication patterns.
 """
 
 import logging
+import time
+from agents._logging import queue_handler
 from typing import Dict, Any, Optional
 from datetime import datetime
 
+_LOG_LEVEL_NAMES = ("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL")
+
+# Last formatted response timestamp, refreshed at most once per millisecond
+_LAST_TS_NS = 0
+_LAST_TS_STR = ""
+
+
+def _response_timestamp() -> str:
+    """Return the current UTC time as ISO string, cached at 1 ms granularity."""
+    global _LAST_TS_NS, _LAST_TS_STR
+    now_ns = time.time_ns()
+    if now_ns - _LAST_TS_NS >= 1_000_000:
+        _LAST_TS_STR = datetime.utcfromtimestamp(now_ns / 1e9).isoformat()
+        _LAST_TS_NS = now_ns
+    return _LAST_TS_STR
+
 
 class BaseAgent:
     """
@@ -21,6 +39,8 @@ class BaseAgent:
     - Error handling framework
     """
     
+    __slots__ = ("name", "orchestrator", "logger", "_log_fns")
+    
     def __init__(self, name: str, orchestrator: Optional[Any] = None):
         """
         Initialize base agent.
@@ -35,26 +55,36 @@ class BaseAgent:
         self._setup_logging()
     
     def _setup_logging(self):
-        """Configure logging for this agent."""
-        handler = logging.StreamHandler()
-        formatter = logging.Formatter(
-            f'[%(asctime)s] [%(name)s] [%(levelname)s] %(message)s',
-            datefmt='%Y-%m-%d %H:%M:%S'
-        )
-        handler.setFormatter(formatter)
-        self.logger.addHandler(handler)
+        """Configure logging for this agent (once per logger name)."""
+        if not self.logger.handlers:
+            formatter = logging.Formatter(
+                f'[%(asctime)s] [%(name)s] [%(levelname)s] %(message)s',
+                datefmt='%Y-%m-%d %H:%M:%S'
+            )
+            # Written to stderr by a background thread (see agents/_logging.py)
+            self.logger.addHandler(queue_handler(formatter))
         self.logger.setLevel(logging.INFO)
+        self.logger.propagate = False
+        
+        # Bound logger methods keyed by level name, resolved once
+        self._log_fns = {
+            level: getattr(self.logger, level.lower()) for level in _LOG_LEVEL_NAMES
+        }
     
     def log(self, message: str, level: str = "INFO"):
         """
         Log a message with the specified level.
         
+        Per-item hot paths should instead call ``self.logger`` with
+        %-style arguments (``self.logger.info("Got: %s", value)``) so the
+        message is only formatted when the level is enabled.
+        
         Args:
             message: Message to log
             level: Log level (DEBUG, INFO, WARNING, ERROR, CRITICAL)
         """
-        log_method = getattr(self.logger, level.lower(), self.logger.info)
-        log_method(message)
+        log_fns = self._log_fns
+        log_fns.get(level, log_fns["INFO"])(message)
     
     def process(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -85,11 +115,14 @@ class BaseAgent:
         Returns:
             Response from orchestrator, if any
         """
-        if self.orchestrator:
-            return self.orchestrator.receive_message(self.name, message)
-        else:
-            self.log("No orchestrator connected", "WARNING")
-            return None
+        try:
+            if self.orchestrator:
+                return self.orchestrator.receive_message(self.name, message)
+        except ReferenceError:
+            # Weak backref whose orchestrator has been collected
+            pass
+        self.log("No orchestrator connected", "WARNING")
+        return None
     
     def validate_input(self, data: Dict[str, Any], required_fields: list) -> bool:
         """
@@ -128,7 +161,7 @@ class BaseAgent:
         response = {
             "agent": self.name,
             "status": status,
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": _response_timestamp(),
             "data": data
         }
         if error:
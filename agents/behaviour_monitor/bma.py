@@ -5,13 +5,204 @@ Tracks long-term user behavior patterns and provides early warnings
 for addiction escalation.
 """
 
-import sys
-import os
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import logging
 
-from base_agent import BaseAgent
+from agents.base_agent import BaseAgent
+from agents._kernels import detect_trend, update_late_night
 from typing import Dict, Any, List
 from datetime import datetime, timedelta
+import time
+import numpy as np
+
+
+# Category -> column in the per-user count vector; unknown categories
+# share the trailing "other" slot
+_CATEGORY_INDEX = {
+    "harmful": 0,
+    "addictive": 1,
+    "entertainment": 2,
+    "neutral": 3,
+    "productive": 4,
+    "educational": 5
+}
+_OTHER_CATEGORY = len(_CATEGORY_INDEX)
+_ADDICTIVE = _CATEGORY_INDEX["addictive"]
+_EDUCATIONAL = _CATEGORY_INDEX["educational"]
+
+
+class BmaStore:
+    """
+    Per-user behavior state in struct-of-arrays form.
+    
+    Every aggregate field is an array indexed by the user's row, so
+    per-user reads are constant-time and cross-user queries are single
+    vectorized passes. Rows are assigned on first sight of a user id;
+    capacity doubles when full. Score/timestamp history is a per-user ring
+    buffer that starts small and doubles as the user views more items, up
+    to history_size, so light users cost a few hundred bytes.
+    """
+    
+    __slots__ = (
+        "user_idx", "user_ids", "history_size",
+        "score_count", "score_sum", "minutes_sum", "daily_minutes", "days",
+        "late_night", "cat_counts", "scores", "timestamps", "cursor", "filled"
+    )
+    
+    # Row-indexed arrays (grown together)
+    _FIELDS = (
+        "score_count", "score_sum", "minutes_sum", "daily_minutes", "days",
+        "late_night", "cat_counts", "cursor", "filled"
+    )
+    
+    # Initial per-user history buffer length
+    _RING_INITIAL = 16
+    
+    def __init__(self, history_size: int = 10000, capacity: int = 8):
+        """
+        Initialize an empty store.
+        
+        Args:
+            history_size: Maximum ring buffer length for per-item history
+            capacity: Initial number of user rows
+        """
+        self.user_idx: Dict[str, int] = {}
+        self.user_ids: List[str] = []
+        self.history_size = history_size
+        
+        self.score_count = np.zeros(capacity, dtype=np.int64)
+        self.score_sum = np.zeros(capacity, dtype=np.int64)
+        self.minutes_sum = np.zeros(capacity, dtype=np.float64)
+        self.daily_minutes = np.zeros(capacity, dtype=np.float64)  # current day
+        self.days = np.zeros(capacity, dtype=np.int64)
+        self.late_night = np.zeros(capacity, dtype=np.int64)
+        self.cat_counts = np.zeros((capacity, _OTHER_CATEGORY + 1), dtype=np.int32)
+        # Per-row history buffers (allocated with the row, grown on demand)
+        self.scores: List[np.ndarray] = []  # index is 0-100
+        self.timestamps: List[np.ndarray] = []  # epoch seconds
+        self.cursor = np.zeros(capacity, dtype=np.int64)
+        self.filled = np.zeros(capacity, dtype=np.bool_)
+    
+    def __len__(self) -> int:
+        return len(self.user_ids)
+    
+    def __contains__(self, user_id: str) -> bool:
+        return user_id in self.user_idx
+    
+    def row(self, user_id: str) -> int:
+        """Return the user's row, allocating one if the user is new."""
+        row = self.user_idx.get(user_id)
+        if row is None:
+            row = len(self.user_ids)
+            if row == len(self.score_count):
+                self._grow()
+            self.user_idx[user_id] = row
+            self.user_ids.append(user_id)
+            size = min(self._RING_INITIAL, self.history_size)
+            self.scores.append(np.empty(size, dtype=np.int8))
+            self.timestamps.append(np.empty(size, dtype=np.float64))
+        return row
+    
+    def _grow(self):
+        """Double row capacity of every aggregate field (new rows zeroed)."""
+        for field in self._FIELDS:
+            old = getattr(self, field)
+            grown = np.zeros((2 * len(old),) + old.shape[1:], dtype=old.dtype)
+            grown[:len(old)] = old
+            setattr(self, field, grown)
+    
+    def record(
+        self,
+        row: int,
+        addiction_index: int,
+        ts: float,
+        hour: int,
+        minutes: float,
+        category: str
+    ):
+        """
+        Record one viewed item for a user row.
+        
+        Args:
+            row: User row from row()
+            addiction_index: Item's Addiction Index (0-100)
+            ts: View time (epoch seconds)
+            hour: Local hour of the view
+            minutes: Estimated minutes watched
+            category: Content category
+        """
+        # Scores are stored as int8, so clamp to the index's 0-100 range
+        # (the running sum uses the same value)
+        addiction_index = min(100, max(0, addiction_index))
+        
+        # Ring buffer overwrites the oldest entry once full; lifetime
+        # totals are kept separately
+        cursor = int(self.cursor[row])
+        if cursor == len(self.scores[row]) and cursor < self.history_size:
+            self._grow_history(row)
+        self.timestamps[row][cursor] = ts
+        self.scores[row][cursor] = addiction_index
+        cursor += 1
+        if cursor == self.history_size:
+            cursor = 0
+            self.filled[row] = True
+        self.cursor[row] = cursor
+        self.score_count[row] += 1
+        self.score_sum[row] += addiction_index
+        
+        self.cat_counts[row, _CATEGORY_INDEX.get(category, _OTHER_CATEGORY)] += 1
+        self.late_night[row] = update_late_night(int(self.late_night[row]), hour)
+        
+        self.minutes_sum[row] += minutes
+        if self.days[row]:
+            self.daily_minutes[row] += minutes
+        else:
+            self.daily_minutes[row] = minutes
+            self.days[row] = 1
+    
+    def _grow_history(self, row: int):
+        """Double a row's history buffers (capped at history_size)."""
+        size = min(2 * len(self.scores[row]), self.history_size)
+        for buffers in (self.scores, self.timestamps):
+            old = buffers[row]
+            grown = np.empty(size, dtype=old.dtype)
+            grown[:len(old)] = old
+            buffers[row] = grown
+    
+    def recent_score_sum(self, row: int, n: int) -> int:
+        """Sum the last n scores in a row's ring buffer, handling wrap-around."""
+        scores = self.scores[row]
+        cursor = int(self.cursor[row])
+        if n <= cursor:
+            return int(scores[cursor - n:cursor].sum(dtype=np.int64))
+        # Window wraps past the start of the buffer (only possible once filled)
+        head = int(scores[:cursor].sum(dtype=np.int64))
+        return head + int(scores[len(scores) - (n - cursor):].sum(dtype=np.int64))
+    
+    def last_timestamp(self, row: int) -> float:
+        """Epoch time of the row's most recent item."""
+        return float(self.timestamps[row][self.cursor[row] - 1])
+    
+    def avg_scores(self) -> np.ndarray:
+        """Average Addiction Index per user row (0 for rows with no items)."""
+        n = len(self.user_ids)
+        counts = self.score_count[:n]
+        return np.divide(
+            self.score_sum[:n], counts,
+            out=np.zeros(n, dtype=np.float64), where=counts > 0
+        )
+    
+    def at_risk_users(self, min_avg_score: float = 60) -> List[str]:
+        """
+        Find users whose average Addiction Index exceeds a threshold.
+        
+        Args:
+            min_avg_score: Average score threshold (exclusive)
+            
+        Returns:
+            Matching user ids
+        """
+        rows = np.flatnonzero(self.avg_scores() > min_avg_score)
+        return [self.user_ids[r] for r in rows]
 
 
 class BehaviorMonitorAgent(BaseAgent):
@@ -26,10 +217,12 @@ class BehaviorMonitorAgent(BaseAgent):
     - Suggest intervention schedules
     """
     
+    __slots__ = ("store",)
+    
     def __init__(self, name: str):
         super().__init__(name)
         # In-memory storage for demo (use database in production)
-        self.user_data = {}
+        self.store = BmaStore()
     
     def process(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -62,7 +255,8 @@ class BehaviorMonitorAgent(BaseAgent):
             # Analyze patterns
             insights = self._analyze_patterns(user_id)
             
-            self.log(f"Behavior analysis complete. Early warning: {insights.get('early_warning', False)}")
+            if self.logger.isEnabledFor(logging.INFO):
+                self.logger.info("Behavior analysis complete. Early warning: %s", insights.get("early_warning", False))
             
             return self.create_response("success", insights)
             
@@ -77,40 +271,14 @@ class BehaviorMonitorAgent(BaseAgent):
         category: str
     ):
         """Update user behavior tracking."""
-        if user_id not in self.user_data:
-            self.user_data[user_id] = {
-                "daily_minutes": [],
-                "category_counts": {},
-                "addiction_scores": [],
-                "timestamps": [],
-                "late_night_count": 0,
-                "binge_sessions": 0
-            }
-        
-        user = self.user_data[user_id]
-        now = datetime.now()
-        
-        # Track timestamp
-        user["timestamps"].append(now.isoformat())
-        
-        # Track addiction score
-        user["addiction_scores"].append(addiction_index)
-        
-        # Track category
-        if category not in user["category_counts"]:
-            user["category_counts"][category] = 0
-        user["category_counts"][category] += 1
-        
-        # Check for late-night usage
-        if now.hour >= 23 or now.hour < 6:
-            user["late_night_count"] += 1
+        ts = time.time()
+        hour = time.localtime(ts).tm_hour
         
         # Estimate minutes (rough approximation)
         duration = content_item.get("duration_sec", 0) / 60
-        if user["daily_minutes"]:
-            user["daily_minutes"][-1] += duration
-        else:
-            user["daily_minutes"].append(duration)
+        
+        store = self.store
+        store.record(store.row(user_id), addiction_index, ts, hour, duration, category)
     
     def _analyze_patterns(self, user_id: str) -> Dict[str, Any]:
         """
@@ -122,7 +290,9 @@ class BehaviorMonitorAgent(BaseAgent):
         Returns:
             Behavior insights and warnings
         """
-        if user_id not in self.user_data:
+        store = self.store
+        row = store.user_idx.get(user_id)
+        if row is None:
             return {
                 "user_summary": {
                     "avg_daily_addictive_minutes": 0,
@@ -134,76 +304,79 @@ class BehaviorMonitorAgent(BaseAgent):
                 "insights": []
             }
         
-        user = self.user_data[user_id]
+        count = int(store.score_count[row])
+        
+        # Totals are maintained incrementally on update; only the short
+        # recent window (at most 5 items) is read from the score buffer
+        score_total = int(store.score_sum[row])
+        recent_len = 5 if count >= 5 else min(count, 3)
+        recent_sum = store.recent_score_sum(row, recent_len)
         
         # Calculate averages
-        avg_addiction_score = (
-            sum(user["addiction_scores"]) / len(user["addiction_scores"])
-            if user["addiction_scores"] else 0
-        )
+        avg_addiction_score = score_total / count if count else 0
         
-        avg_daily_minutes = (
-            sum(user["daily_minutes"]) / len(user["daily_minutes"])
-            if user["daily_minutes"] else 0
-        )
+        days = int(store.days[row])
+        avg_daily_minutes = float(store.minutes_sum[row]) / days if days else 0
+        
+        late_night_count = int(store.late_night[row])
+        categories = store.cat_counts[row]
         
         # Detect trend
-        trend = self._detect_trend(user["addiction_scores"])
+        trend = self._detect_trend(score_total, recent_sum, recent_len, count)
         
         # Early warning conditions
         early_warning = (
             avg_addiction_score > 60 or
             avg_daily_minutes > 60 or
-            user["late_night_count"] > 3 or
+            late_night_count > 3 or
             trend == "increasing"
         )
         
         # Generate insights
-        insights = self._generate_insights(user, avg_addiction_score, avg_daily_minutes)
+        insights = self._generate_insights(
+            late_night_count, categories, avg_addiction_score, avg_daily_minutes
+        )
         
         # Suggest intervention schedule
         intervention_schedule = self._suggest_intervention_schedule(
-            user, early_warning, avg_addiction_score
+            late_night_count, categories, early_warning, avg_addiction_score
         )
         
         return {
             "user_summary": {
                 "avg_daily_addictive_minutes": round(avg_daily_minutes, 1),
                 "avg_addiction_score": round(avg_addiction_score, 1),
-                "streak_days": len(user["daily_minutes"]),
+                "streak_days": days,
                 "trend": trend,
-                "total_items_viewed": len(user["addiction_scores"])
+                "total_items_viewed": count
             },
             "early_warning": early_warning,
             "suggested_intervention_schedule": intervention_schedule,
             "insights": insights
         }
     
-    def _detect_trend(self, scores: List[int]) -> str:
-        """Detect trend in addiction scores."""
-        if len(scores) < 3:
+    def _detect_trend(
+        self,
+        score_total: int,
+        recent_sum: int,
+        recent_len: int,
+        count: int
+    ) -> str:
+        """Detect trend in addiction scores from window sums."""
+        if count < 3:
             return "stable"
         
         # Compare recent vs older scores
-        recent = scores[-5:] if len(scores) >= 5 else scores[-3:]
-        older = scores[:-5] if len(scores) >= 5 else scores[:-3]
-        
-        if not older:
-            return "stable"
-        
-        recent_avg = sum(recent) / len(recent)
-        older_avg = sum(older) / len(older)
-        
-        if recent_avg > older_avg * 1.25:
-            return "increasing"
-        elif recent_avg < older_avg * 0.75:
-            return "decreasing"
-        else:
-            return "stable"
+        direction = detect_trend(
+            float(recent_sum), recent_len,
+            float(score_total - recent_sum), count - recent_len
+        )
+        return ("stable", "increasing", "decreasing")[direction]  # -1 -> last
     
     def _generate_insights(
         self,
-        user: Dict[str, Any],
+        late_night_count: int,
+        categories: np.ndarray,
         avg_score: float,
         avg_minutes: float
     ) -> List[str]:
@@ -211,7 +384,7 @@ class BehaviorMonitorAgent(BaseAgent):
         insights = []
         
         # Late-night usage
-        if user["late_night_count"] > 3:
+        if late_night_count > 3:
             insights.append("Late-night usage pattern detected (>3 sessions after 11 PM)")
         
         # High addiction score
@@ -223,11 +396,10 @@ class BehaviorMonitorAgent(BaseAgent):
             insights.append(f"Daily addictive content time exceeds 1 hour ({avg_minutes:.1f} min)")
         
         # Category distribution
-        categories = user["category_counts"]
-        if "addictive" in categories and categories["addictive"] > 5:
-            insights.append(f"High consumption of addictive content ({categories['addictive']} items)")
+        if categories[_ADDICTIVE] > 5:
+            insights.append(f"High consumption of addictive content ({categories[_ADDICTIVE]} items)")
         
-        if "educational" in categories and categories["educational"] < 2:
+        if 0 < categories[_EDUCATIONAL] < 2:
             insights.append("Low engagement with educational content")
         
         # Positive insights
@@ -238,7 +410,8 @@ class BehaviorMonitorAgent(BaseAgent):
     
     def _suggest_intervention_schedule(
         self,
-        user: Dict[str, Any],
+        late_night_count: int,
+        categories: np.ndarray,
         early_warning: bool,
         avg_score: float
     ) -> str:
@@ -249,7 +422,7 @@ class BehaviorMonitorAgent(BaseAgent):
         suggestions = []
         
         # Late-night interventions
-        if user["late_night_count"] > 3:
+        if late_night_count > 3:
             suggestions.append("Increase intervention strength during evening hours (9 PM - 12 AM)")
         
         # High addiction score
@@ -257,20 +430,27 @@ class BehaviorMonitorAgent(BaseAgent):
             suggestions.append("Apply blur interventions more aggressively")
         
         # Category-based
-        if user["category_counts"].get("addictive", 0) > 5:
+        if categories[_ADDICTIVE] > 5:
             suggestions.append("Proactively suggest alternatives for short-form content")
         
         return "; ".join(suggestions) if suggestions else "Monitor closely and adjust interventions as needed"
     
     def _get_user_stats(self, user_id: str) -> Dict[str, Any]:
         """Get user statistics."""
-        if user_id not in self.user_data:
+        row = self.store.user_idx.get(user_id)
+        if row is None:
             return self.create_response("success", {
                 "user_id": user_id,
                 "message": "No data available for this user"
             })
         
         insights = self._analyze_patterns(user_id)
+        
+        # Timestamps are stored as epoch floats; format only on export
+        if self.store.score_count[row]:
+            last_ts = self.store.last_timestamp(row)
+            insights["user_summary"]["last_active"] = datetime.utcfromtimestamp(last_ts).isoformat()
+        
         return self.create_response("success", insights)
 
 
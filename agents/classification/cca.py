@@ -5,15 +5,126 @@ Uses AI (Gemini LLM) to classify content into categories and detect
 emotional triggers that may lead to addictive behavior.
 """
 
-import sys
 import os
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import time
+import asyncio
+import hashlib
+from collections import OrderedDict
 
-from base_agent import BaseAgent
-from typing import Dict, Any
+from agents.base_agent import BaseAgent
+from agents._keywords import match_keyword_families
+from backend.core.prompts import CCA_SYSTEM_PROMPT_WITH_EXAMPLES, format_cca_prompt
+from backend.core.schemas import CCAResult
+from typing import Dict, Any, List, Optional
 import json
 
 
+# Heuristic rules, first match wins:
+# (title indicator, category, confidence, thumbnail sentiment, reason)
+# A reason of None is chosen from _ADDICTIVE_REASONS by trigger.
+_CATEGORY_RULES = (
+    ("has_educational_keywords", "educational", 0.75, "positive",
+     "Educational content for skill development"),
+    ("has_addictive_keywords", "addictive", 0.80, "negative", None),
+    ("has_clickbait_keywords", "entertainment", 0.70, "neutral",
+     "General content without strong indicators"),
+)
+_DEFAULT_RULE = ("neutral", 0.60, "neutral", "General content without strong indicators")
+
+# Triggers found by title keyword family, in reporting order
+_TITLE_TRIGGERS = ("compilation", "humor", "shock", "FOMO")
+
+# Addictive-content reasons: (required triggers, reason), first match wins
+_ADDICTIVE_REASONS = (
+    (("short_duration", "compilation"), "Short compilation triggers dopamine loops"),
+    (("short_duration",), "Short-form content encourages binge-watching"),
+    (("compilation",), "Compilation format promotes extended viewing"),
+    ((), "Content patterns suggest addictive potential"),
+)
+
+# Classification schema checked by _validate_classification
+_REQUIRED_FIELDS = ("category", "reason", "triggers", "thumbnail_sentiment", "confidence")
+_VALID_CATEGORIES = frozenset((
+    "educational", "productive", "neutral", "entertainment", "addictive", "harmful"
+))
+
+
+def _build_fast_heuristic():
+    """
+    Generate the heuristic classifier as straight-line code.
+    
+    The rule tables above are invariant, so they are partially evaluated
+    into a single function: the category ladder, trigger checks and reason
+    selection become literal branches with constants inlined.
+    
+    Returns:
+        Function mapping a feed item to a classification dict
+    """
+    flag = {t: f"t_{t}" for t in ("short_duration", "clickbait") + _TITLE_TRIGGERS}
+    lines = [
+        "def _fn(feed_item):",
+        "    title = feed_item.get('title', '').lower()",
+        "    duration = feed_item.get('duration_sec', 0)",
+        "    ti = feed_item.get('context', {}).get('title_indicators', {})",
+        "    families = match_keyword_families(title)",
+        "    triggers = []",
+        f"    {flag['short_duration']} = duration < 60",
+        f"    if {flag['short_duration']}:",
+        "        triggers.append('short_duration')",
+    ]
+    for trigger in _TITLE_TRIGGERS:
+        lines += [
+            f"    {flag[trigger]} = {trigger!r} in families",
+            f"    if {flag[trigger]}:",
+            f"        triggers.append({trigger!r})",
+        ]
+    lines += [
+        f"    {flag['clickbait']} = ti.get('has_clickbait_keywords')",
+        f"    if {flag['clickbait']}:",
+        "        triggers.append('clickbait')",
+    ]
+    
+    keyword = "if"
+    for indicator, category, confidence, sentiment, reason in _CATEGORY_RULES:
+        lines.append(f"    {keyword} ti.get({indicator!r}):")
+        lines.append(f"        category, confidence, sentiment = {category!r}, {confidence!r}, {sentiment!r}")
+        if reason is not None:
+            lines.append(f"        reason = {reason!r}")
+        else:
+            sub = "if"
+            for required, text in _ADDICTIVE_REASONS:
+                if required:
+                    cond = " and ".join(flag[t] for t in required)
+                    lines.append(f"        {sub} {cond}:")
+                else:
+                    lines.append("        else:")
+                lines.append(f"            reason = {text!r}")
+                sub = "elif"
+        keyword = "elif"
+    category, confidence, sentiment, reason = _DEFAULT_RULE
+    lines += [
+        "    else:",
+        f"        category, confidence, sentiment = {category!r}, {confidence!r}, {sentiment!r}",
+        f"        reason = {reason!r}",
+        f"    if {flag['clickbait']}:",
+        "        sentiment = 'clickbait'",
+        "    return {",
+        "        'category': category,",
+        "        'reason': reason,",
+        "        'triggers': triggers,",
+        "        'thumbnail_sentiment': sentiment,",
+        "        'confidence': confidence",
+        "    }",
+    ]
+    
+    namespace = {"match_keyword_families": match_keyword_families}
+    exec(compile("\n".join(lines), "<cca_fast_heuristic>", "exec"), namespace)
+    return namespace["_fn"]
+
+
+_FAST_HEURISTIC = _build_fast_heuristic()
+
+
 class ContentClassificationAgent(BaseAgent):
     """
     Content Classification Agent - AI-powered content analysis.
@@ -27,23 +138,56 @@ class ContentClassificationAgent(BaseAgent):
     Uses LLM for deep semantic understanding.
     """
     
+    # L1 classification cache: exact-match on normalized feed item
+    _L1_MAXSIZE = 1000
+    _L1_TTL = 600  # seconds
+    
     def __init__(self, name: str):
         super().__init__(name)
         self.llm_client = None
+        self._l1 = OrderedDict()  # key -> (stored_at, classification)
+        self._fast_heuristic = _FAST_HEURISTIC
+        self.semantic_cache = None
+        self.local_model = None
+        # Local classifier confidence at or above which the LLM is skipped
+        self.llm_fallback_threshold = float(os.getenv("CCA_LLM_FALLBACK_THRESHOLD", "0.8"))
         self._initialize_llm()
+        self._initialize_semantic_cache()
+        self._initialize_local_classifier()
     
     def _initialize_llm(self):
         """Initialize LLM client."""
         try:
-            # Import here to avoid circular dependency
-            sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'backend', 'services'))
-            from llm_client import get_llm_client
+            # Import here so a missing provider SDK only disables the LLM path
+            from backend.services.llm_client import get_llm_client
             self.llm_client = get_llm_client("gemini")
             self.log("LLM client initialized successfully")
         except Exception as e:
             self.log(f"Failed to initialize LLM client: {e}", "WARNING")
             self.llm_client = None
     
+    def _initialize_semantic_cache(self):
+        """Initialize L2 semantic cache (optional; stays None if unavailable)."""
+        try:
+            from backend.services.semantic_cache import get_semantic_cache
+            cache = get_semantic_cache("cca")
+            self.semantic_cache = cache if cache.enabled else None
+        except Exception as e:
+            self.log(f"Semantic cache unavailable: {e}", "WARNING")
+            self.semantic_cache = None
+    
+    def _initialize_local_classifier(self):
+        """Load the local text classifier (optional; stays None if unavailable)."""
+        try:
+            from backend.services.classification_service import load_text_model, classify_content
+            self.local_model = load_text_model()
+            # Bound once so per-item classification doesn't re-run the import
+            self._classify_text = classify_content
+            self.log("Local text classifier loaded")
+        except Exception as e:
+            self.log(f"Local text classifier unavailable: {e}", "WARNING")
+            self.local_model = None
+    
     def process(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Classify content using AI.
@@ -57,31 +201,133 @@ class ContentClassificationAgent(BaseAgent):
         self.log("Classifying content...")
         
         try:
-            # Extract feed item
-            feed_item = data.get("feed_item", data.get("raw_feed", data))
+            feed_item, response = self._classify_without_llm(data)
+            if response:
+                return response
             
-            if not feed_item:
-                return self.handle_error(
-                    ValueError("No feed item found in data"),
-                    "Content classification"
-                )
+            result = self._classify_with_llm(feed_item) if self.llm_client else None
+            return self._llm_or_heuristic_response(feed_item, result)
             
-            # Try LLM classification first
-            if self.llm_client:
-                result = self._classify_with_llm(feed_item)
-                if result:
-                    self.log(f"LLM classification: {result.get('category')} (confidence: {result.get('confidence')})")
-                    return self.create_response("success", result)
+        except Exception as e:
+            return self.handle_error(e, "Content classification")
+    
+    async def process_async(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Classify content using AI without blocking the event loop.
+        
+        Same contract as process(); the LLM call is awaited.
+        
+        Args:
+            data: Feed item with metadata from FIA
             
-            # Fallback to heuristic classification
-            self.log("Using heuristic classification (LLM unavailable)", "WARNING")
-            result = self._classify_heuristic(feed_item)
+        Returns:
+            Classification results with category, triggers, confidence
+        """
+        self.log("Classifying content...")
+        
+        try:
+            feed_item, response = self._classify_without_llm(data)
+            if response:
+                return response
             
-            return self.create_response("success", result)
+            result = await self._aclassify_with_llm(feed_item) if self.llm_client else None
+            return self._llm_or_heuristic_response(feed_item, result)
             
         except Exception as e:
             return self.handle_error(e, "Content classification")
     
+    def _classify_without_llm(self, data: Dict[str, Any]) -> tuple:
+        """
+        Shared first step of process() and process_async().
+        
+        Args:
+            data: Feed item with metadata from FIA
+        
+        Returns:
+            (feed_item, response); response is set when no LLM call is
+            needed (missing feed item or a confident local prediction)
+        """
+        # Extract feed item
+        feed_item = data.get("feed_item", data.get("raw_feed", data))
+        
+        if not feed_item:
+            return feed_item, self.handle_error(
+                ValueError("No feed item found in data"),
+                "Content classification"
+            )
+        
+        # Confident local classifier prediction: no LLM call needed
+        result = self._classify_local(feed_item)
+        if result:
+            self.logger.info(
+                "Local classification: %s (confidence: %s)",
+                result.get("category"), result.get("confidence")
+            )
+            return feed_item, self.create_response("success", result)
+        
+        return feed_item, None
+    
+    def _llm_or_heuristic_response(
+        self,
+        feed_item: Dict[str, Any],
+        result: Optional[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """
+        Shared last step of process() and process_async().
+        
+        Args:
+            feed_item: Content metadata
+            result: LLM classification, or None if unavailable or failed
+        
+        Returns:
+            Response with the LLM result, else a heuristic classification
+        """
+        if result:
+            self.logger.info(
+                "LLM classification: %s (confidence: %s)",
+                result.get("category"), result.get("confidence")
+            )
+            return self.create_response("success", result)
+        
+        # Fallback to heuristic classification
+        self.log("Using heuristic classification (LLM unavailable)", "WARNING")
+        result = self._classify_heuristic(feed_item)
+        
+        return self.create_response("success", result)
+    
+    async def process_batch(
+        self,
+        items: List[Dict[str, Any]],
+        max_concurrency: int = 8
+    ) -> List[Dict[str, Any]]:
+        """
+        Classify several feed items concurrently.
+        
+        Args:
+            items: Payloads as accepted by process()
+            max_concurrency: Maximum LLM requests in flight (keep within
+                the provider's rate limit)
+            
+        Returns:
+            One classification response per item, in input order
+        """
+        sem = asyncio.Semaphore(max_concurrency)
+        
+        # Embed every semantic-cache lookup in one model call up front
+        if self.semantic_cache:
+            texts = []
+            for item in items:
+                feed_item = item.get("feed_item", item.get("raw_feed", item))
+                if feed_item and self._l1_get(self._cache_key(feed_item)) is None:
+                    texts.append(self._semantic_text(feed_item))
+            await asyncio.to_thread(self.semantic_cache.prefetch, texts)
+        
+        async def one(item: Dict[str, Any]) -> Dict[str, Any]:
+            async with sem:
+                return await self.process_async(item)
+        
+        return await asyncio.gather(*(one(item) for item in items))
+    
     def _classify_with_llm(self, feed_item: Dict[str, Any]) -> Dict[str, Any]:
         """
         Classify using LLM (Gemini).
@@ -93,115 +339,211 @@ class ContentClassificationAgent(BaseAgent):
             Classification dict or None if failed
         """
         try:
-            # Import prompts
-            sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'backend', 'core'))
-            from prompts import CCA_SYSTEM_PROMPT, format_cca_prompt
+            # Reuse a recent classification of the same item
+            key = self._cache_key(feed_item)
+            cached = self._l1_get(key)
+            if cached is not None:
+                return cached
+            
+            # Then a classification of a semantically similar item
+            semantic_text = None
+            if self.semantic_cache:
+                semantic_text = self._semantic_text(feed_item)
+                cached = self.semantic_cache.check(semantic_text)
+                if cached and self._validate_classification(cached):
+                    self._l1_put(key, cached)
+                    return cached
             
-            # Format prompt with feed item data
-            user_prompt = format_cca_prompt(feed_item)
+            system_prompt, user_prompt = self._build_prompts(feed_item)
             
             # Generate classification
             response = self.llm_client.generate(
-                system_prompt=CCA_SYSTEM_PROMPT,
+                system_prompt=system_prompt,
                 user_prompt=user_prompt,
-                temperature=0.3  # Lower temperature for more consistent classification
+                temperature=0.0,  # Deterministic JSON classification
+                max_tokens=200,  # Classification JSON is short; caps decode time
+                cache_system_prompt=True,  # Stable prefix served from the provider's prompt cache
+                response_schema=CCAResult  # Constrained decoding: always parseable JSON
             )
             
-            if not response:
-                return None
+            classification = self._parse_classification(response)
+            if classification:
+                self._l1_put(key, classification)
+                if semantic_text:
+                    self.semantic_cache.store(semantic_text, classification)
+            return classification
+            
+        except Exception as e:
+            self.log(f"LLM classification error: {e}", "ERROR")
+            return None
+    
+    async def _aclassify_with_llm(self, feed_item: Dict[str, Any]) -> Dict[str, Any]:
+        """Async variant of _classify_with_llm()."""
+        try:
+            key = self._cache_key(feed_item)
+            cached = self._l1_get(key)
+            if cached is not None:
+                return cached
             
-            # Parse JSON response
-            classification = self.llm_client.parse_json_response(response)
+            semantic_text = None
+            if self.semantic_cache:
+                semantic_text = self._semantic_text(feed_item)
+                cached = await self.semantic_cache.acheck(semantic_text)
+                if cached and self._validate_classification(cached):
+                    self._l1_put(key, cached)
+                    return cached
             
-            if not classification:
-                self.log("Failed to parse LLM response", "ERROR")
-                return None
+            system_prompt, user_prompt = self._build_prompts(feed_item)
             
-            # Validate classification
-            if not self._validate_classification(classification):
-                self.log("Invalid classification structure", "ERROR")
-                return None
+            # Concurrent classifications (e.g. a scrolled feed page) share one LLM call
+            response = await self.llm_client.agenerate_batched(
+                system_prompt=system_prompt,
+                user_prompt=user_prompt,
+                temperature=0.0,
+                max_tokens=200,
+                cache_system_prompt=True,
+                response_schema=CCAResult
+            )
             
+            classification = self._parse_classification(response)
+            if classification:
+                self._l1_put(key, classification)
+                if semantic_text:
+                    await self.semantic_cache.astore(semantic_text, classification)
             return classification
             
         except Exception as e:
             self.log(f"LLM classification error: {e}", "ERROR")
             return None
     
-    def _classify_heuristic(self, feed_item: Dict[str, Any]) -> Dict[str, Any]:
+    def _cache_key(self, feed_item: Dict[str, Any]) -> str:
         """
-        Fallback heuristic classification (rule-based).
+        Build the L1 cache key for a feed item.
+        
+        Normalizes the fields that drive classification (case-folded title,
+        duration rounded to 10 s, channel, platform, content type and title
+        indicators) and hashes them.
+        """
+        context = feed_item.get("context", {})
+        indicators = context.get("title_indicators", {})
+        normalized = {
+            "title": " ".join(str(feed_item.get("title", "")).lower().split()),
+            "duration": round((feed_item.get("duration_sec") or 0) / 10) * 10,
+            "channel": feed_item.get("channel", ""),
+            "platform": feed_item.get("platform", "youtube"),
+            "content_type": context.get("content_type", ""),
+            "indicators": sorted(k for k, v in indicators.items() if v)
+        }
+        return hashlib.sha256(json.dumps(normalized, sort_keys=True).encode()).hexdigest()
+    
+    def _semantic_text(self, feed_item: Dict[str, Any]) -> str:
+        """Normalized title + channel text used as the L2 semantic cache key."""
+        title = " ".join(str(feed_item.get("title", "")).lower().split())
+        channel = " ".join(str(feed_item.get("channel", "")).lower().split())
+        return f"{title} | {channel}" if channel else title
+    
+    def _l1_get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return a fresh cached classification, or None."""
+        entry = self._l1.get(key)
+        if entry is None:
+            return None
+        stored_at, classification = entry
+        if time.monotonic() - stored_at > self._L1_TTL:
+            del self._l1[key]
+            return None
+        self._l1.move_to_end(key)
+        return classification
+    
+    def _l1_put(self, key: str, classification: Dict[str, Any]):
+        """Cache a classification, evicting the least recently used entry when full."""
+        self._l1[key] = (time.monotonic(), classification)
+        self._l1.move_to_end(key)
+        if len(self._l1) > self._L1_MAXSIZE:
+            self._l1.popitem(last=False)
+    
+    def _build_prompts(self, feed_item: Dict[str, Any]) -> tuple:
+        """Return (system_prompt, user_prompt) for classifying a feed item."""
+        # Format prompt with feed item data
+        return CCA_SYSTEM_PROMPT_WITH_EXAMPLES, format_cca_prompt(feed_item)
+    
+    def _parse_classification(self, response: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Parse and validate a raw LLM classification response."""
+        if not response:
+            return None
+        
+        # Parse JSON response
+        classification = self.llm_client.parse_json_response(response)
+        
+        if not classification:
+            self.log("Failed to parse LLM response", "ERROR")
+            return None
+        
+        # Validate classification
+        if not self._validate_classification(classification):
+            self.log("Invalid classification structure", "ERROR")
+            return None
+        
+        return classification
+    
+    def _classify_local(self, feed_item: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Classify with the local text classifier when it is confident enough.
+        
+        First step of a two-step cascade: only items the local model scores
+        below llm_fallback_threshold go on to the LLM. Triggers and
+        thumbnail sentiment come from the keyword heuristic.
         
         Args:
             feed_item: Content metadata
-            
+        
         Returns:
-            Classification dict
+            Classification dict, or None to fall through to the LLM
         """
-        title = feed_item.get("title", "").lower()
-        duration = feed_item.get("duration_sec", 0)
-        context = feed_item.get("context", {})
-        title_indicators = context.get("title_indicators", {})
-        
-        # Determine category
-        if title_indicators.get("has_educational_keywords"):
-            category = "educational"
-            confidence = 0.75
-        elif title_indicators.get("has_addictive_keywords"):
-            category = "addictive"
-            confidence = 0.80
-        elif title_indicators.get("has_clickbait_keywords"):
-            category = "entertainment"
-            confidence = 0.70
-        else:
-            category = "neutral"
-            confidence = 0.60
-        
-        # Detect triggers
-        triggers = []
-        if duration < 60:
-            triggers.append("short_duration")
-        if "compilation" in title or "best of" in title:
-            triggers.append("compilation")
-        if any(kw in title for kw in ["funny", "meme", "laugh"]):
-            triggers.append("humor")
-        if any(kw in title for kw in ["shocking", "insane", "crazy"]):
-            triggers.append("shock")
-        if any(kw in title for kw in ["viral", "trending", "must see"]):
-            triggers.append("FOMO")
-        if title_indicators.get("has_clickbait_keywords"):
-            triggers.append("clickbait")
-        
-        # Determine thumbnail sentiment
-        if title_indicators.get("has_clickbait_keywords"):
-            thumbnail_sentiment = "clickbait"
-        elif category == "educational":
-            thumbnail_sentiment = "positive"
-        elif category == "addictive":
-            thumbnail_sentiment = "negative"
-        else:
-            thumbnail_sentiment = "neutral"
+        if self.local_model is None:
+            return None
         
-        # Generate reason
-        reason = self._generate_reason(category, triggers, duration)
+        try:
+            prediction = self._classify_text(feed_item)
+        except Exception as e:
+            self.log(f"Local classification error: {e}", "ERROR")
+            return None
+        
+        confidence = prediction.get("confidence")
+        category = str(prediction.get("category"))
+        if confidence is None or confidence < self.llm_fallback_threshold or category not in _VALID_CATEGORIES:
+            return None
         
+        heuristic = self._fast_heuristic(feed_item)
         return {
             "category": category,
-            "reason": reason,
-            "triggers": triggers,
-            "thumbnail_sentiment": thumbnail_sentiment,
-            "confidence": confidence
+            "reason": "Confident local text classifier prediction",
+            "triggers": heuristic["triggers"],
+            "thumbnail_sentiment": heuristic["thumbnail_sentiment"],
+            "confidence": round(float(confidence), 2)
         }
     
+    def _classify_heuristic(self, feed_item: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Fallback heuristic classification (rule-based).
+        
+        Runs the straight-line classifier generated from the rule tables
+        at import time (see _build_fast_heuristic).
+        
+        Args:
+            feed_item: Content metadata
+            
+        Returns:
+            Classification dict
+        """
+        return self._fast_heuristic(feed_item)
+    
     def _validate_classification(self, classification: Dict[str, Any]) -> bool:
         """Validate classification structure."""
-        required_fields = ["category", "reason", "triggers", "thumbnail_sentiment", "confidence"]
-        
-        if not all(field in classification for field in required_fields):
+        if not all(field in classification for field in _REQUIRED_FIELDS):
             return False
         
-        valid_categories = ["educational", "productive", "neutral", "entertainment", "addictive", "harmful"]
-        if classification["category"] not in valid_categories:
+        category = classification["category"]
+        if not isinstance(category, str) or category not in _VALID_CATEGORIES:
             return False
         
         if not isinstance(classification["triggers"], list):
@@ -212,33 +554,11 @@ class ContentClassificationAgent(BaseAgent):
         
         return True
     
-    def _generate_reason(self, category: str, triggers: list, duration: int) -> str:
-        """Generate human-readable reason for classification."""
-        if category == "addictive":
-            if "short_duration" in triggers and "compilation" in triggers:
-                return "Short compilation triggers dopamine loops"
-            elif "short_duration" in triggers:
-                return "Short-form content encourages binge-watching"
-            elif "compilation" in triggers:
-                return "Compilation format promotes extended viewing"
-            else:
-                return "Content patterns suggest addictive potential"
-        
-        elif category == "educational":
-            return "Educational content for skill development"
-        
-        elif category == "productive":
-            return "Productive content aligned with goals"
-        
-        elif category == "harmful":
-            return "Content may have negative impact"
-        
-        else:
-            return "General content without strong indicators"
-
 
 # Test the agent
 if __name__ == "__main__":
+    import orjson
+    
     agent = ContentClassificationAgent("CCA_Test")
     
     test_item = {
@@ -260,4 +580,4 @@ if __name__ == "__main__":
     
     result = agent.process(test_item)
     
-    print(json.dumps(result, indent=2))
+    print(orjson.dumps(result, option=orjson.OPT_INDENT_2).decode())
@@ -4,12 +4,64 @@ Chrome Extension Control Agent (CECA)
 Translates intervention decisions into browser UI actions and DOM operations.
 """
 
-import sys
-import os
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from agents.base_agent import BaseAgent
+from typing import Dict, Any, List, Sequence
 
-from base_agent import BaseAgent
-from typing import Dict, Any, List
+
+# Interventions whose overlay text also shows the risk score
+_SCORED_INTERVENTIONS = frozenset(("blur", "replace", "lockout"))
+
+# Intervention templates. Buttons are tuples of dicts shared across
+# responses, so they are never mutated (see _customize_buttons).
+_INTERVENTION_TEMPLATES = {
+    "blur": {
+        "overlay_text": "High-Risk Content Detected ⚠️",
+        "cta_buttons": (
+            {"label": "Show Alternatives", "action_key": "show_alternatives"},
+            {"label": "Reveal Content", "action_key": "reveal"}
+        )
+    },
+    "nudge": {
+        "overlay_text": "Consider a productive alternative 💡",
+        "cta_buttons": (
+            {"label": "Show Alternatives", "action_key": "show_alternatives"},
+        )
+    },
+    "replace": {
+        "overlay_text": "Content Replaced with Alternatives 🎯",
+        "cta_buttons": (
+            {"label": "View Alternatives", "action_key": "show_alternatives"},
+        )
+    },
+    "lockout": {
+        "overlay_text": "Take a mindful break 🧘",
+        "cta_buttons": (
+            {"label": "Set Timer", "action_key": "set_timer"},
+        ),
+        "timer_seconds": 300  # 5 minutes
+    },
+    "none": {
+        "overlay_text": "",
+        "cta_buttons": ()
+    }
+}
+
+# CSS snippets per intervention type
+_CSS_TEMPLATES = {
+    "blur": """
+                filter: blur(8px);
+                pointer-events: none;
+                user-select: none;
+            """,
+    "lockout": """
+                filter: grayscale(100%) blur(4px);
+                opacity: 0.5;
+                pointer-events: none;
+            """,
+    "replace": """
+                display: none;
+            """
+}
 
 
 class ExtensionControlAgent(BaseAgent):
@@ -26,39 +78,8 @@ class ExtensionControlAgent(BaseAgent):
     def __init__(self, name: str):
         super().__init__(name)
         
-        # Intervention templates
-        self.intervention_templates = {
-            "blur": {
-                "overlay_text": "High-Risk Content Detected ⚠️",
-                "cta_buttons": [
-                    {"label": "Show Alternatives", "action_key": "show_alternatives"},
-                    {"label": "Reveal Content", "action_key": "reveal"}
-                ]
-            },
-            "nudge": {
-                "overlay_text": "Consider a productive alternative 💡",
-                "cta_buttons": [
-                    {"label": "Show Alternatives", "action_key": "show_alternatives"}
-                ]
-            },
-            "replace": {
-                "overlay_text": "Content Replaced with Alternatives 🎯",
-                "cta_buttons": [
-                    {"label": "View Alternatives", "action_key": "show_alternatives"}
-                ]
-            },
-            "lockout": {
-                "overlay_text": "Take a mindful break 🧘",
-                "cta_buttons": [
-                    {"label": "Set Timer", "action_key": "set_timer"}
-                ],
-                "timer_seconds": 300  # 5 minutes
-            },
-            "none": {
-                "overlay_text": "",
-                "cta_buttons": []
-            }
-        }
+        # Shared, module-level intervention templates (read-only)
+        self.intervention_templates = _INTERVENTION_TEMPLATES
     
     def process(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -118,7 +139,7 @@ class ExtensionControlAgent(BaseAgent):
                 "addiction_index": addiction_index
             }
             
-            self.log(f"UI instructions generated for: {intervention_type}")
+            self.logger.info("UI instructions generated for: %s", intervention_type)
             
             return self.create_response("success", result)
             
@@ -146,34 +167,36 @@ class ExtensionControlAgent(BaseAgent):
             return ""
         
         # Add score for high-risk content
-        if intervention_type in ["blur", "replace", "lockout"] and addiction_index > 70:
+        if intervention_type in _SCORED_INTERVENTIONS and addiction_index > 70:
             return f"{base_text} (Risk: {addiction_index}/100)"
         
         return base_text
     
     def _customize_buttons(
         self,
-        base_buttons: List[Dict[str, str]],
+        base_buttons: Sequence[Dict[str, str]],
         alternatives: List[Dict[str, Any]]
     ) -> List[Dict[str, str]]:
         """
         Customize button labels based on available alternatives.
         
         Args:
-            base_buttons: Base button templates
+            base_buttons: Base button templates (shared, not modified)
             alternatives: Available alternative content
             
         Returns:
-            Customized buttons
+            Customized buttons; unchanged buttons are the template dicts
+            themselves, only relabeled ones are copied
         """
-        buttons = base_buttons.copy()
+        if not alternatives:
+            return list(base_buttons)
         
         # Update "Show Alternatives" button if alternatives available
-        for button in buttons:
-            if button["action_key"] == "show_alternatives" and alternatives:
-                button["label"] = f"View {len(alternatives)} Alternatives"
-        
-        return buttons
+        label = f"View {len(alternatives)} Alternatives"
+        return [
+            {**button, "label": label} if button["action_key"] == "show_alternatives" else button
+            for button in base_buttons
+        ]
     
     def _generate_css(self, intervention_type: str) -> str:
         """
@@ -185,23 +208,7 @@ class ExtensionControlAgent(BaseAgent):
         Returns:
             CSS snippet or empty string
         """
-        css_templates = {
-            "blur": """
-                filter: blur(8px);
-                pointer-events: none;
-                user-select: none;
-            """,
-            "lockout": """
-                filter: grayscale(100%) blur(4px);
-                opacity: 0.5;
-                pointer-events: none;
-            """,
-            "replace": """
-                display: none;
-            """
-        }
-        
-        return css_templates.get(intervention_type, "")
+        return _CSS_TEMPLATES.get(intervention_type, "")
 
 
 # Test the agent
@@ -224,5 +231,5 @@ if __name__ == "__main__":
     
     result = agent.process(test_data)
     
-    import json
-    print(json.dumps(result, indent=2))
+    import orjson
+    print(orjson.dumps(result, option=orjson.OPT_INDENT_2).decode())
@@ -5,12 +5,33 @@ Collects and normalizes feed data from YouTube/Instagram.
 Validates and structures content items for downstream agents.
 """
 
-import sys
-import os
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import re
+import hashlib
 
-from base_agent import BaseAgent
-from typing import Dict, Any
+from agents.base_agent import BaseAgent
+from agents._keywords import match_keyword_families, KEYWORD_PATTERNS
+from typing import Dict, Any, List
+import numpy as np
+
+
+# Title shape checks, done in C instead of per-character generators
+_DIGIT_RE = re.compile(r"\d")
+# Whitespace-delimited tokens of 3+ chars with no ASCII lowercase letters
+# (candidates for an all-caps word; confirmed with str.isupper)
+_CAPS_CANDIDATE_RE = re.compile(r"(?<!\S)[^\sa-z]{3,}(?!\S)")
+
+
+def _has_numbers(title: str) -> bool:
+    """Same as any(char.isdigit() for char in title)."""
+    if _DIGIT_RE.search(title):
+        return True
+    # str.isdigit also accepts non-decimal digits (e.g. superscripts)
+    return not title.isascii() and any(char.isdigit() for char in title)
+
+
+def _has_caps(title: str) -> bool:
+    """Same as any(word.isupper() and len(word) > 2 for word in title.split())."""
+    return any(word.isupper() for word in _CAPS_CANDIDATE_RE.findall(title))
 
 
 class FeedIngestionAgent(BaseAgent):
@@ -24,6 +45,13 @@ class FeedIngestionAgent(BaseAgent):
     - Add context information
     """
     
+    # Duration bucket edges/labels for the batch path (mirror
+    # _infer_content_type and _categorize_duration)
+    _CONTENT_TYPE_BINS = (60, 600)
+    _CONTENT_TYPES = np.array(["short_form", "medium_form", "long_form"])
+    _DURATION_BINS = (60, 300, 900, 3600)
+    _DURATION_CATEGORIES = np.array(["under_1min", "1_to_5min", "5_to_15min", "15min_to_1hr", "over_1hr"])
+    
     def __init__(self, name: str):
         super().__init__(name)
         self.required_fields = ["title"]
@@ -49,34 +77,13 @@ class FeedIngestionAgent(BaseAgent):
                     "Input validation"
                 )
             
-            # Normalize platform
-            platform = data.get("platform", "youtube").lower()
-            if platform not in self.supported_platforms:
-                self.log(f"Unsupported platform: {platform}, defaulting to youtube", "WARNING")
-                platform = "youtube"
-            
             # Extract and normalize fields
-            normalized = {
-                "id": data.get("id", self._generate_id(data)),
-                "title": data.get("title", "").strip(),
-                "url": data.get("url", ""),
-                "duration_sec": data.get("duration_sec", 0),
-                "channel": data.get("channel", "Unknown"),
-                "thumbnail": data.get("thumbnail", ""),
-                "description": data.get("description", ""),
-                "platform": platform,
-                "metadata": {
-                    "has_duration": data.get("duration_sec") is not None,
-                    "has_thumbnail": bool(data.get("thumbnail")),
-                    "title_length": len(data.get("title", "")),
-                    "has_description": bool(data.get("description"))
-                }
-            }
+            normalized = self._normalize(data)
             
             # Add context
             context = self._extract_context(normalized)
             
-            self.log(f"Successfully processed: {normalized['title'][:50]}...")
+            self.logger.info("Successfully processed: %s...", normalized["title"][:50])
             
             return self.create_response(
                 status="success",
@@ -90,11 +97,110 @@ class FeedIngestionAgent(BaseAgent):
         except Exception as e:
             return self.handle_error(e, "Feed ingestion")
     
+    def ingest_batch(self, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Process a page of feed items at once.
+        
+        Title keyword indicators and duration buckets are computed with
+        vectorized pandas/NumPy operations over the whole page instead of
+        per item. Items that cannot take the vectorized path (invalid input,
+        non-numeric duration) go through process() individually.
+        
+        Args:
+            items: Raw content items from extension
+            
+        Returns:
+            One response per item, in input order
+        """
+        import pandas as pd
+        
+        self.logger.info("Processing batch of %d feed items...", len(items))
+        
+        results = [None] * len(items)
+        positions, batch = [], []
+        for i, data in enumerate(items):
+            if (
+                isinstance(data, dict)
+                and isinstance(data.get("title"), str)
+                and isinstance(data.get("duration_sec", 0), (int, float))
+            ):
+                try:
+                    batch.append(self._normalize(data))
+                    positions.append(i)
+                    continue
+                except Exception:
+                    pass
+            results[i] = self.process(data)
+        
+        if batch:
+            # One regex pass per keyword family over all titles
+            titles = pd.Series([item["title"] for item in batch], dtype="string").str.lower()
+            families = {
+                family: titles.str.contains(KEYWORD_PATTERNS[family], regex=True).tolist()
+                for family in ("addictive", "educational", "clickbait")
+            }
+            
+            # Duration buckets as vector comparisons
+            durations = np.array([item["duration_sec"] for item in batch], dtype=np.float64)
+            content_types = self._CONTENT_TYPES[np.digitize(durations, self._CONTENT_TYPE_BINS)].tolist()
+            duration_categories = self._DURATION_CATEGORIES[np.digitize(durations, self._DURATION_BINS)].tolist()
+            
+            for j, (i, normalized) in enumerate(zip(positions, batch)):
+                title = normalized["title"]
+                context = {
+                    "platform": normalized["platform"],
+                    "content_type": content_types[j],
+                    "duration_category": duration_categories[j],
+                    "title_indicators": {
+                        "has_addictive_keywords": families["addictive"][j],
+                        "has_educational_keywords": families["educational"][j],
+                        "has_clickbait_keywords": families["clickbait"][j],
+                        "has_numbers": _has_numbers(title),
+                        "has_caps": _has_caps(title),
+                        "has_emoji": not title.isascii()
+                    }
+                }
+                results[i] = self.create_response(
+                    status="success",
+                    data={
+                        "raw_feed": normalized,
+                        "context": context,
+                        "user_history": items[i].get("user_history", [])
+                    }
+                )
+        
+        return results
+    
+    def _normalize(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Normalize raw item fields and platform."""
+        # Normalize platform
+        platform = data.get("platform", "youtube").lower()
+        if platform not in self.supported_platforms:
+            self.log(f"Unsupported platform: {platform}, defaulting to youtube", "WARNING")
+            platform = "youtube"
+        
+        return {
+            "id": data["id"] if "id" in data else self._generate_id(data),
+            "title": data.get("title", "").strip(),
+            "url": data.get("url", ""),
+            "duration_sec": data.get("duration_sec", 0),
+            "channel": data.get("channel", "Unknown"),
+            "thumbnail": data.get("thumbnail", ""),
+            "description": data.get("description", ""),
+            "platform": platform,
+            "metadata": {
+                "has_duration": data.get("duration_sec") is not None,
+                "has_thumbnail": bool(data.get("thumbnail")),
+                "title_length": len(data.get("title", "")),
+                "has_description": bool(data.get("description"))
+            }
+        }
+    
     def _generate_id(self, data: Dict[str, Any]) -> str:
         """Generate unique ID for content item if not provided."""
-        import hashlib
+        # Non-cryptographic use: 6-byte BLAKE2b digest (12 hex chars)
         content = f"{data.get('title', '')}{data.get('url', '')}"
-        return hashlib.md5(content.encode()).hexdigest()[:12]
+        return hashlib.blake2b(content.encode(), digest_size=6).hexdigest()
     
     def _extract_context(self, item: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -145,33 +251,15 @@ class FeedIngestionAgent(BaseAgent):
         
         These help downstream agents make quick decisions.
         """
-        title_lower = title.lower()
-        
-        # Addictive indicators
-        addictive_keywords = [
-            "try not to laugh", "compilation", "meme", "funny",
-            "best of", "fails", "reaction", "tiktok", "viral"
-        ]
-        
-        # Educational indicators
-        educational_keywords = [
-            "tutorial", "learn", "study", "lecture", "course",
-            "guide", "how to", "explained", "documentary"
-        ]
-        
-        # Clickbait indicators
-        clickbait_keywords = [
-            "you won't believe", "shocking", "must see", "gone wrong",
-            "insane", "crazy", "unbelievable"
-        ]
+        families = match_keyword_families(title.lower())
         
         return {
-            "has_addictive_keywords": any(kw in title_lower for kw in addictive_keywords),
-            "has_educational_keywords": any(kw in title_lower for kw in educational_keywords),
-            "has_clickbait_keywords": any(kw in title_lower for kw in clickbait_keywords),
-            "has_numbers": any(char.isdigit() for char in title),
-            "has_caps": any(word.isupper() and len(word) > 2 for word in title.split()),
-            "has_emoji": any(ord(char) > 127 for char in title)
+            "has_addictive_keywords": "addictive" in families,
+            "has_educational_keywords": "educational" in families,
+            "has_clickbait_keywords": "clickbait" in families,
+            "has_numbers": _has_numbers(title),
+            "has_caps": _has_caps(title),
+            "has_emoji": not title.isascii()
         }
 
 
@@ -189,5 +277,5 @@ if __name__ == "__main__":
     
     result = agent.process(test_item)
     
-    import json
-    print(json.dumps(result, indent=2))
+    import orjson
+    print(orjson.dumps(result, option=orjson.OPT_INDENT_2).decode())
@@ -6,31 +6,67 @@ Orchestrator - FeedZenAI Core Brain (Phase-1 skeleton)
 - Minimal, well-documented, easy to extend for Phase-2 (LLM/ML integration)
 """
 
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
+import re
 import uuid
 import time
 import logging
 import asyncio
+import weakref
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 
-# configure simple logging
-logging.basicConfig(level=logging.INFO)
+import numpy as np
+
+from agents._kernels import history_stats
+from agents._logging import queue_handler
+
+# configure simple logging (like logging.basicConfig, but stream writes happen
+# on a background thread so they never block the event loop)
+if not logging.root.handlers:
+    logging.root.addHandler(queue_handler(logging.Formatter(logging.BASIC_FORMAT)))
+    logging.root.setLevel(logging.INFO)
 logger = logging.getLogger("orchestrator")
 
 class Orchestrator:
     def __init__(self):
         self.agents: Dict[str, Any] = {}
-        # optional telemetry store (in-memory for phase-1)
-        self.telemetry = []
+        # optional telemetry store (in-memory for phase-1); a ring buffer so a
+        # long-running server keeps only the most recent calls
+        self.telemetry = deque(maxlen=10000)
+        # exact per-agent call counts (not limited by the ring buffer)
+        self.call_counts: Dict[str, int] = {}
+        # calls are buffered and flushed into telemetry/call_counts in batches,
+        # every telemetry_flush_size calls or telemetry_flush_interval seconds
+        self._telemetry_buf: List[tuple] = []
+        # guards the buffer, telemetry and call_counts (pipeline_run may be
+        # called from several threads)
+        self._telemetry_lock = threading.Lock()
+        self.telemetry_flush_size = 100
+        self.telemetry_flush_interval = 5.0
+        self._flush_task: Optional[asyncio.Task] = None
+        # sync-only agents doing blocking network I/O; the async pipeline runs them in threads
+        self.threaded_agents = set()
+        # bounded pool for sync agents called from async code (not the loop's default executor)
+        self.executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="orchestrator")
+        # agent name -> bound process_async (None if the agent has none), resolved on first send
+        self._async_methods: Dict[str, Any] = {}
+        # ROA (YouTube API + LLM) only runs for addictive items scoring at least this
+        self.roa_min_addiction_index = 60
 
     def register(self, name: str, agent_obj: Any) -> None:
         """Register an agent instance under a name."""
         self.agents[name] = agent_obj
-        # set backref so agents can call orchestrator if needed
+        self._async_methods.pop(name, None)
+        # set backref so agents can call orchestrator if needed; a weak proxy,
+        # so the orchestrator <-> agent cycle doesn't keep replaced agents
+        # (and their caches / LLM clients) alive until a cyclic GC pass
         try:
-            setattr(agent_obj, "orchestrator", self)
+            setattr(agent_obj, "orchestrator", weakref.proxy(self))
         except Exception:
             pass
-        logger.info(f"Registered agent: {name}")
+        logger.info("Registered agent: %s", name)
 
     def get(self, name: str) -> Optional[Any]:
         """Get an agent by name."""
@@ -41,7 +77,7 @@ class Orchestrator:
         agent = self.get(name)
         if not agent:
             raise KeyError(f"Agent '{name}' not registered")
-        logger.info(f"Sending payload to {name}: {payload.get('id', '<no-id>')}")
+        logger.info("Sending payload to %s: %s", name, payload.get("id", "<no-id>"))
         result = agent.process(payload)
         self._record_telemetry(name, payload, result)
         return result
@@ -51,16 +87,48 @@ class Orchestrator:
         agent = self.get(name)
         if not agent:
             raise KeyError(f"Agent '{name}' not registered")
-        logger.info(f"(async) Sending payload to {name}: {payload.get('id', '<no-id>')}")
-        if hasattr(agent, "process_async"):
-            result = await agent.process_async(payload)
+        logger.info("(async) Sending payload to %s: %s", name, payload.get("id", "<no-id>"))
+        process_async = self._async_method(name, agent)
+        if process_async is not None:
+            result = await process_async(payload)
         else:
             # default to sync call in async context
-            loop = asyncio.get_event_loop()
-            result = await loop.run_in_executor(None, agent.process, payload)
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(self.executor, agent.process, payload)
         self._record_telemetry(name, payload, result)
         return result
 
+    def _async_method(self, name: str, agent: Any) -> Any:
+        """Bound process_async of a registered agent (or None), looked up once per agent."""
+        try:
+            return self._async_methods[name]
+        except KeyError:
+            method = self._async_methods[name] = getattr(agent, "process_async", None)
+            return method
+
+    async def send_batch_async(self, name: str, payloads: List[Dict[str, Any]], max_concurrency: int = 8) -> List[Any]:
+        """Send many payloads to one agent concurrently (uses the agent's async process_batch(payloads, max_concurrency=...) if it has one)."""
+        agent = self.get(name)
+        if not agent:
+            raise KeyError(f"Agent '{name}' not registered")
+        logger.info("(batch) Sending %d payloads to %s", len(payloads), name)
+        if hasattr(agent, "process_batch"):
+            results = await agent.process_batch(payloads, max_concurrency=max_concurrency)
+            for payload, result in zip(payloads, results):
+                self._record_telemetry(name, payload, result)
+            return results
+        sem = asyncio.Semaphore(max_concurrency)
+
+        async def one(payload):
+            async with sem:
+                return await self.send_async(name, payload)
+
+        return await asyncio.gather(*(one(p) for p in payloads))
+
+    def send_batch(self, name: str, payloads: List[Dict[str, Any]], max_concurrency: int = 8) -> List[Any]:
+        """Synchronous wrapper around send_batch_async() (not for use inside a running event loop)."""
+        return asyncio.run(self.send_batch_async(name, payloads, max_concurrency))
+
     def broadcast(self, payload: Dict[str, Any]) -> Dict[str, Any]:
         """Call process() on every registered agent and return results dict."""
         results = {}
@@ -69,52 +137,79 @@ class Orchestrator:
                 results[name] = agent.process(payload)
                 self._record_telemetry(name, payload, results[name])
             except Exception as e:
-                logger.exception(f"Error running agent {name}: {e}")
+                logger.exception("Error running agent %s: %s", name, e)
                 results[name] = {"error": str(e)}
         return results
 
+    def _needs_recommendations(self, cca_out: Dict[str, Any], asa_out: Dict[str, Any]) -> bool:
+        """Whether ROA should run: only addictive items with a high enough addiction index."""
+        # real agents wrap their output in create_response()'s "data"; demo agents don't
+        cca_data = cca_out.get("data", cca_out)
+        asa_data = asa_out.get("data", asa_out)
+        return (
+            cca_data.get("category") == "addictive"
+            and asa_data.get("addiction_index", 0) >= self.roa_min_addiction_index
+        )
+
+    @staticmethod
+    def _stage_payload(fia_out: Dict[str, Any], raw_feed: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Start the payload shared by every stage after FIA.
+
+        Stages add their inputs to this one dict as the run progresses
+        (classified/classification, score/recent_score, decision_context) instead of each
+        getting a freshly built dict; agents read only the keys they use.
+        """
+        return {
+            "feed_item": raw_feed,
+            "item": raw_feed,
+            "context": fia_out.get("context", {}),
+            "user_history": fia_out.get("user_history", [])
+        }
+
     def pipeline_run(self, content_item: Dict[str, Any]) -> Dict[str, Any]:
         """
         Run the default ZenFeed pipeline:
         FIA -> CCA -> ASA -> ROA -> BMA -> CECA
         Each agent receives the relevant payload; agents must be registered under these names.
+        Stages after FIA share one payload dict (see _stage_payload).
         """
         run_id = str(uuid.uuid4())
-        start = time.time()
-        logger.info(f"Pipeline start: run_id={run_id} item_id={content_item.get('id')}")
+        start_ns = time.monotonic_ns()
+        logger.info("Pipeline start: run_id=%s item_id=%s", run_id, content_item.get("id"))
 
         # 1) Ingestion (FIA)
         fia_out = self.send("FIA", content_item)
+        raw_feed = fia_out.get("raw_feed", content_item)
+        payload = self._stage_payload(fia_out, raw_feed)
 
         # 2) Classification (CCA)
-        cca_input = {"feed_item": fia_out.get("raw_feed", content_item)}
-        cca_out = self.send("CCA", cca_input)
+        cca_out = self.send("CCA", payload)
 
-        # 3) Addiction Scoring (ASA)
-        asa_input = {"classified": cca_out, "context": fia_out.get("context", {})}
-        asa_out = self.send("ASA", asa_input)
+        # 3) Addiction Scoring (ASA) - the real ASA reads "classification"
+        payload["classified"] = payload["classification"] = cca_out
+        asa_out = self.send("ASA", payload)
 
-        # 4) Recommendation Optimization (ROA)
-        roa_input = {"classified": cca_out, "score": asa_out}
-        roa_out = self.send("ROA", roa_input)
+        # 4) Recommendation Optimization (ROA) - skipped for non-addictive items
+        payload["score"] = payload["recent_score"] = asa_out
+        if self._needs_recommendations(cca_out, asa_out):
+            roa_out = self.send("ROA", payload)
+        else:
+            roa_out = {"alternatives": [], "skipped": True}
 
         # 5) Behaviour Monitor (BMA) - optional long-term check
-        bma_input = {"user_history": fia_out.get("user_history", []), "recent_score": asa_out}
-        bma_out = self.send("BMA", bma_input)
+        bma_out = self.send("BMA", payload)
 
         # 6) Chrome Extension Control (CECA) - returns DOM actions / instructions
-        ceca_input = {
-            "decision_context": {
-                "cca": cca_out,
-                "asa": asa_out,
-                "roa": roa_out,
-                "bma": bma_out
-            },
-            "item": fia_out.get("raw_feed", content_item)
+        payload["decision_context"] = {
+            "cca": cca_out,
+            "asa": asa_out,
+            "roa": roa_out,
+            "bma": bma_out
         }
-        ceca_out = self.send("CECA", ceca_input)
+        ceca_out = self.send("CECA", payload)
 
-        total_time = time.time() - start
+        total_time = (time.monotonic_ns() - start_ns) / 1e9
         pipeline_result = {
             "run_id": run_id,
             "fia": fia_out,
@@ -126,24 +221,303 @@ class Orchestrator:
             "elapsed_seconds": round(total_time, 3)
         }
 
-        logger.info(f"Pipeline complete: run_id={run_id} elapsed={pipeline_result['elapsed_seconds']}s")
+        logger.info("Pipeline complete: run_id=%s elapsed=%ss", run_id, pipeline_result["elapsed_seconds"])
         return pipeline_result
 
+    async def _send_stage(self, name: str, payload: Dict[str, Any]) -> Any:
+        """
+        Run one pipeline stage without blocking the event loop on I/O:
+        - agents with process_async() are awaited (CCA -> LLM, ROA -> YouTube/LLM)
+        - agents in threaded_agents run in a worker thread
+        - everything else is microsecond CPU work and runs inline, which also
+          keeps stateful agents (BMA) single-threaded
+        """
+        agent = self.get(name)
+        if not agent:
+            raise KeyError(f"Agent '{name}' not registered")
+        process_async = self._async_method(name, agent)
+        if process_async is not None:
+            result = await process_async(payload)
+        elif name in self.threaded_agents:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(self.executor, agent.process, payload)
+        else:
+            result = agent.process(payload)
+        self._record_telemetry(name, payload, result)
+        return result
+
+    # Async pipeline stages. Each takes the per-item run context (a dict
+    # holding the input item, the outputs so far and the shared stage
+    # payload) and adds its output.
+    async def _stage_fia(self, ctx: Dict[str, Any]) -> None:
+        item = ctx["item"]
+        ctx["fia"] = fia_out = await self._send_stage("FIA", item)
+        ctx["raw_feed"] = raw_feed = fia_out.get("raw_feed", item)
+        ctx["payload"] = self._stage_payload(fia_out, raw_feed)
+
+    async def _stage_cca(self, ctx: Dict[str, Any]) -> None:
+        ctx["cca"] = await self._send_stage("CCA", ctx["payload"])
+
+    async def _stage_asa(self, ctx: Dict[str, Any]) -> None:
+        payload = ctx["payload"]
+        payload["classified"] = payload["classification"] = ctx["cca"]
+        ctx["asa"] = await self._send_stage("ASA", payload)
+
+    async def _stage_roa_bma(self, ctx: Dict[str, Any]) -> None:
+        # ROA and BMA depend only on CCA/ASA output, so they run concurrently
+        payload = ctx["payload"]
+        payload["score"] = payload["recent_score"] = asa_out = ctx["asa"]
+        if self._needs_recommendations(ctx["cca"], asa_out):
+            ctx["roa"], ctx["bma"] = await asyncio.gather(
+                self._send_stage("ROA", payload),
+                self._send_stage("BMA", payload)
+            )
+        else:
+            ctx["roa"] = {"alternatives": [], "skipped": True}
+            ctx["bma"] = await self._send_stage("BMA", payload)
+
+    async def _stage_ceca(self, ctx: Dict[str, Any]) -> None:
+        payload = ctx["payload"]
+        payload["decision_context"] = {
+            "cca": ctx["cca"],
+            "asa": ctx["asa"],
+            "roa": ctx["roa"],
+            "bma": ctx["bma"]
+        }
+        ctx["ceca"] = await self._send_stage("CECA", payload)
+
+    def _start_run(self, content_item: Dict[str, Any]) -> Dict[str, Any]:
+        """Create the run context for one item."""
+        run_id = str(uuid.uuid4())
+        logger.info("(async) Pipeline start: run_id=%s item_id=%s", run_id, content_item.get("id"))
+        return {"run_id": run_id, "start_ns": time.monotonic_ns(), "item": content_item}
+
+    def _finish_run(self, ctx: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the pipeline_run()-shaped result from a completed run context."""
+        pipeline_result = {
+            "run_id": ctx["run_id"],
+            "fia": ctx["fia"],
+            "cca": ctx["cca"],
+            "asa": ctx["asa"],
+            "roa": ctx["roa"],
+            "bma": ctx["bma"],
+            "ceca": ctx["ceca"],
+            "elapsed_seconds": round((time.monotonic_ns() - ctx["start_ns"]) / 1e9, 3)
+        }
+        logger.info("(async) Pipeline complete: run_id=%s elapsed=%ss", ctx["run_id"], pipeline_result["elapsed_seconds"])
+        return pipeline_result
+
+    async def pipeline_run_async(self, content_item: Dict[str, Any]) -> Dict[str, Any]:
+        """Async pipeline_run(): same stages and result, I/O stages awaited."""
+        ctx = self._start_run(content_item)
+        for stage in (self._stage_fia, self._stage_cca, self._stage_asa, self._stage_roa_bma, self._stage_ceca):
+            await stage(ctx)
+        return self._finish_run(ctx)
+
+    async def pipeline_run_batch(self, content_items: List[Dict[str, Any]], queue_size: int = 32, io_workers: int = 8) -> List[Dict[str, Any]]:
+        """
+        Run many items through a staged pipeline: one asyncio.Queue per stage
+        (FIA -> CCA -> ASA -> ROA+BMA -> CECA) with workers pulling from each, so
+        different items occupy different stages at the same time.
+        Bounded queues give backpressure; I/O stages (CCA, ROA+BMA) get
+        io_workers workers, CPU stages one each. Results are in input order;
+        the first stage error is re-raised once the batch has drained.
+        """
+        stages = [
+            (self._stage_fia, 1),
+            (self._stage_cca, io_workers),
+            (self._stage_asa, 1),
+            (self._stage_roa_bma, io_workers),
+            (self._stage_ceca, 1),
+        ]
+        queues = [asyncio.Queue(maxsize=queue_size) for _ in stages]
+        results: List[Any] = [None] * len(content_items)
+        errors: List[BaseException] = []
+
+        async def worker(stage, q_in, q_out):
+            while True:
+                index, ctx = await q_in.get()
+                try:
+                    await stage(ctx)
+                except Exception as e:
+                    logger.exception("Pipeline stage %s failed: run_id=%s", stage.__name__, ctx["run_id"])
+                    errors.append(e)
+                else:
+                    if q_out is not None:
+                        await q_out.put((index, ctx))
+                    else:
+                        results[index] = self._finish_run(ctx)
+                finally:
+                    q_in.task_done()
+
+        workers = [
+            asyncio.create_task(worker(stage, q_in, q_out))
+            for (stage, count), q_in, q_out in zip(stages, queues, queues[1:] + [None])
+            for _ in range(count)
+        ]
+        try:
+            for index, item in enumerate(content_items):
+                await queues[0].put((index, self._start_run(item)))
+            # an item is put on the next queue before task_done() on the
+            # current one, so joining in stage order waits for everything
+            for q in queues:
+                await q.join()
+        finally:
+            for w in workers:
+                w.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+        if errors:
+            raise errors[0]
+        return results
+
+    async def pipeline_run_many_async(self, content_items: List[Dict[str, Any]], max_inflight: int = 16) -> List[Dict[str, Any]]:
+        """
+        Run the pipeline over many items concurrently, so CPU stages of one item
+        overlap the LLM/API waits of others. At most max_inflight items are in
+        the pipeline at once; results are returned in input order.
+        """
+        sem = asyncio.Semaphore(max_inflight)
+
+        async def one(item):
+            async with sem:
+                return await self.pipeline_run_async(item)
+
+        return await asyncio.gather(*(one(item) for item in content_items))
+
+    def pipeline_run_many(self, content_items: List[Dict[str, Any]], max_inflight: int = 16) -> List[Dict[str, Any]]:
+        """Synchronous wrapper around pipeline_run_many_async() (not for use inside a running event loop)."""
+        return asyncio.run(self.pipeline_run_many_async(content_items, max_inflight))
+
     def _record_telemetry(self, agent_name: str, input_payload: Dict[str, Any], output: Any) -> None:
-        """Store simple telemetry for debugging and basic observability."""
-        entry = {
-            "time": time.time(),
-            "agent": agent_name,
-            "input_id": input_payload.get("id"),
-            "output_summary": getattr(output, "__repr__", lambda: str(output))()
+        """
+        Store simple telemetry for debugging and basic observability.
+        Only appends to the pending buffer; the output is kept by reference
+        and any summary is built on demand.
+        """
+        entry = (time.monotonic_ns(), agent_name, input_payload.get("id"), output)
+        with self._telemetry_lock:
+            buf = self._telemetry_buf
+            buf.append(entry)
+            if len(buf) >= self.telemetry_flush_size:
+                self._flush_telemetry_locked()
+
+    def flush_telemetry(self) -> None:
+        """Move buffered calls into the telemetry ring buffer and call counts."""
+        with self._telemetry_lock:
+            self._flush_telemetry_locked()
+
+    def _flush_telemetry_locked(self) -> None:
+        """flush_telemetry() body; the caller holds _telemetry_lock."""
+        buf, self._telemetry_buf = self._telemetry_buf, []
+        if not buf:
+            return
+        counts = self.call_counts
+        self.telemetry.extend(
+            {"time_ns": time_ns, "agent": agent, "input_id": input_id, "output": output}
+            for time_ns, agent, input_id, output in buf
+        )
+        for _, agent, _, _ in buf:
+            counts[agent] = counts.get(agent, 0) + 1
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.telemetry_flush_interval)
+            self.flush_telemetry()
+
+    def start_telemetry_flusher(self) -> None:
+        """Start periodic telemetry flushing on the running event loop (e.g. at server startup)."""
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.get_running_loop().create_task(self._flush_loop())
+
+    async def stop_telemetry_flusher(self) -> None:
+        """Stop periodic flushing and flush whatever is pending."""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            await asyncio.gather(self._flush_task, return_exceptions=True)
+            self._flush_task = None
+        self.flush_telemetry()
+
+    async def aclose_agents(self) -> None:
+        """Release agent-held resources (e.g. pooled HTTP sessions) via their aclose()."""
+        for name, agent in self.agents.items():
+            aclose = getattr(agent, "aclose", None)
+            if aclose is None:
+                continue
+            try:
+                await aclose()
+            except Exception as e:
+                logger.exception("Error closing agent %s: %s", name, e)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Summarize recorded telemetry (JSON-serializable)."""
+        with self._telemetry_lock:
+            self._flush_telemetry_locked()
+            calls_by_agent = dict(self.call_counts)
+            telemetry_entries = len(self.telemetry)
+        return {
+            "total_calls": sum(calls_by_agent.values()),
+            "calls_by_agent": calls_by_agent,
+            "registered_agents": list(self.agents),
+            "telemetry_entries": telemetry_entries,
+            "telemetry_capacity": self.telemetry.maxlen
         }
-        self.telemetry.append(entry)
+
+    def get_recent_telemetry(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """Most recent telemetry entries with output summaries rendered now (newest last)."""
+        with self._telemetry_lock:
+            self._flush_telemetry_locked()
+            entries = list(self.telemetry)[-limit:] if limit > 0 else []
+        now_ns = time.monotonic_ns()
+        return [
+            {
+                "age_seconds": round((now_ns - entry["time_ns"]) / 1e9, 3),
+                "agent": entry["agent"],
+                "input_id": entry["input_id"],
+                "output_summary": repr(entry["output"])
+            }
+            for entry in entries
+        ]
+
+    def reset_metrics(self) -> None:
+        """Clear telemetry and call counts."""
+        with self._telemetry_lock:
+            self._telemetry_buf = []
+            self.telemetry.clear()
+            self.call_counts.clear()
 
 # ---------------------------
 # Minimal demo agents (phase-1 stubs)
 # You can replace these with full agent implementations in later phases.
 # ---------------------------
-class DemoFIA:
+
+# DemoCCA keyword scans (one C-level pass per category over the lowercased title)
+_DEMO_ADDICTIVE_RE = re.compile("meme|funny|compilation")
+_DEMO_EDUCATIONAL_RE = re.compile("tutorial|study|lecture")
+
+# Demo agents are pure functions of a small discrete input, so their results
+# are table lookups. Entries are shared: process() returns a shallow copy.
+_DEMO_CCA_RESULTS = {
+    "addictive": {"category": "addictive", "confidence": 0.9, "reason": "heuristic-demo"},
+    "educational": {"category": "educational", "confidence": 0.88, "reason": "heuristic-demo"},
+    "neutral": {"category": "neutral", "confidence": 0.6, "reason": "heuristic-demo"}
+}
+_DEMO_ASA_RESULTS = {
+    "addictive": {"addiction_index": 85, "risk_level": "high", "recommended_action": "blur"},
+    "neutral": {"addiction_index": 30, "risk_level": "low", "recommended_action": "none"}
+}
+_DEMO_ASA_DEFAULT = {"addiction_index": 10, "risk_level": "low", "recommended_action": "none"}
+_DEMO_BREAK_ACTIONS = frozenset(("blur", "replace"))
+_DEMO_DAILY_LIMIT = 60.0  # addictive minutes per day
+
+class _DemoAgent:
+    """Demo agents are microsecond pure-Python work: run inline when awaited
+    instead of hopping to an executor thread."""
+
+    async def process_async(self, payload):
+        return self.process(payload)
+
+class DemoFIA(_DemoAgent):
     def __init__(self, name="FIA"):
         self.name = name
         self.orchestrator = None
@@ -157,7 +531,7 @@ class DemoFIA:
             "user_history": payload.get("user_history", [])
         }
 
-class DemoCCA:
+class DemoCCA(_DemoAgent):
     def __init__(self, name="CCA"):
         self.name = name
 
@@ -166,18 +540,15 @@ class DemoCCA:
         title = item.get("title", "")
         # Super-simple heuristic classification (phase-1 stub)
         lower = title.lower()
-        if any(k in lower for k in ["meme", "funny", "compilation"]):
+        if _DEMO_ADDICTIVE_RE.search(lower):
             category = "addictive"
-            confidence = 0.9
-        elif any(k in lower for k in ["tutorial", "study", "lecture"]):
+        elif _DEMO_EDUCATIONAL_RE.search(lower):
             category = "educational"
-            confidence = 0.88
         else:
             category = "neutral"
-            confidence = 0.6
-        return {"category": category, "confidence": confidence, "reason": "heuristic-demo"}
+        return dict(_DEMO_CCA_RESULTS[category])
 
-class DemoASA:
+class DemoASA(_DemoAgent):
     def __init__(self, name="ASA"):
         self.name = name
 
@@ -185,21 +556,9 @@ class DemoASA:
         classified = payload.get("classified", {})
         category = classified.get("category", "neutral")
         # simple mapping to addiction index
-        if category == "addictive":
-            idx = 85
-            level = "high"
-            action = "blur"
-        elif category == "neutral":
-            idx = 30
-            level = "low"
-            action = "none"
-        else:
-            idx = 10
-            level = "low"
-            action = "none"
-        return {"addiction_index": idx, "risk_level": level, "recommended_action": action}
+        return dict(_DEMO_ASA_RESULTS.get(category, _DEMO_ASA_DEFAULT))
 
-class DemoROA:
+class DemoROA(_DemoAgent):
     def __init__(self, name="ROA"):
         self.name = name
 
@@ -215,17 +574,32 @@ class DemoROA:
             alternatives = []
         return {"alternatives": alternatives}
 
-class DemoBMA:
+class DemoBMA(_DemoAgent):
     def __init__(self, name="BMA"):
         self.name = name
 
     def process(self, payload):
         history = payload.get("user_history", [])
-        avg = sum(history) / len(history) if history else 0
-        early_warning = avg > 60  # demo rule: avg addictive minutes > 60/day
-        return {"avg_daily_addictive_minutes": avg, "early_warning": early_warning}
+        if hasattr(history, "mean"):
+            # NumPy array history (long-lived users): one compiled pass. Lists
+            # are not converted; list -> array costs more than sum() itself
+            avg, streak = history_stats(np.ascontiguousarray(history, dtype=np.float64), _DEMO_DAILY_LIMIT)
+        else:
+            avg = sum(history) / len(history) if history else 0
+            streak = 0
+            for minutes in reversed(history):
+                if minutes <= _DEMO_DAILY_LIMIT:
+                    break
+                streak += 1
+        # demo rule: avg addictive minutes > 60/day, or the last 3+ days over it
+        early_warning = avg > _DEMO_DAILY_LIMIT or streak >= 3
+        return {
+            "avg_daily_addictive_minutes": avg,
+            "days_over_limit": streak,
+            "early_warning": early_warning
+        }
 
-class DemoCECA:
+class DemoCECA(_DemoAgent):
     def __init__(self, name="CECA"):
         self.name = name
 
@@ -233,13 +607,20 @@ class DemoCECA:
         decision_context = payload.get("decision_context", {})
         asa = decision_context.get("asa", {})
         action = asa.get("recommended_action", "none")
-        overlay_text = "Take a 5 minute break" if action in ("blur", "replace") else ""
+        overlay_text = "Take a 5 minute break" if action in _DEMO_BREAK_ACTIONS else ""
         return {"final_intervention": action, "overlay_text": overlay_text}
 
 # ---------------------------
 # Local demo runner
 # ---------------------------
 if __name__ == "__main__":
+    # libuv event loop for the asyncio.run() calls behind the sync batch helpers
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
+
     # quick demo - register demo agents and run pipeline
     orch = Orchestrator()
     orch.register("FIA", DemoFIA())
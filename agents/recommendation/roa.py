@@ -5,12 +5,76 @@ Searches for and ranks productive alternative content to replace
 addictive items.
 """
 
-import sys
-import os
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import time
+from collections import OrderedDict
+from types import MappingProxyType
 
-from base_agent import BaseAgent
-from typing import Dict, Any, List
+from agents.base_agent import BaseAgent
+from backend.core.prompts import ROA_SYSTEM_PROMPT, format_roa_prompt
+from backend.core.schemas import ROAResult
+from typing import Dict, Any, Iterator, List, Optional
+
+# External services are optional: a missing SDK/dependency only disables
+# that path (resolved once at import, not per agent or per request)
+try:
+    from backend.services.youtube_service import YouTubeService
+except ImportError as e:
+    YouTubeService = None
+    _YOUTUBE_IMPORT_ERROR = e
+try:
+    from backend.services.llm_client import get_llm_client, iter_json_array_items
+except ImportError as e:
+    get_llm_client = None
+    iter_json_array_items = None
+    _LLM_IMPORT_ERROR = e
+
+
+# Fallback search queries when the LLM is unavailable or returns none
+_DEFAULT_QUERIES = (
+    "python programming tutorial for beginners",
+    "productivity tips for students",
+    "5 minute meditation for focus"
+)
+
+# Mock alternatives by query keyword (shared; results are copied)
+_MOCK_ALTERNATIVES = MappingProxyType({
+    "study with me": {
+        "title": "Study With Me - 30 min Pomodoro Focus Session",
+        "url": "https://youtube.com/watch?v=demo_study",
+        "reason": "Structured study time with proven productivity technique",
+        "type": "video",
+        "estimated_duration": 1800
+    },
+    "meditation": {
+        "title": "5-Minute Meditation Break for Focus",
+        "url": "https://youtube.com/watch?v=demo_meditation",
+        "reason": "Quick mental reset to improve concentration",
+        "type": "guided_exercise",
+        "estimated_duration": 300
+    },
+    "tutorial": {
+        "title": "Python Basics - 10 Minute Tutorial",
+        "url": "https://youtube.com/watch?v=demo_python",
+        "reason": "Learn a valuable skill in short time",
+        "type": "video",
+        "estimated_duration": 600
+    },
+    "exercise": {
+        "title": "Quick Desk Exercises - 5 Minutes",
+        "url": "https://youtube.com/watch?v=demo_exercise",
+        "reason": "Physical activity to boost energy and focus",
+        "type": "guided_exercise",
+        "estimated_duration": 300
+    },
+    "productivity": {
+        "title": "3 Productivity Hacks That Actually Work",
+        "url": "https://youtube.com/watch?v=demo_productivity",
+        "reason": "Practical tips to improve daily efficiency",
+        "type": "video",
+        "estimated_duration": 480
+    }
+})
+_MOCK_ALTERNATIVE_ITEMS = tuple(_MOCK_ALTERNATIVES.items())
 
 
 class RecommendationOptimizerAgent(BaseAgent):
@@ -24,19 +88,28 @@ class RecommendationOptimizerAgent(BaseAgent):
     - Cache results to minimize API quota usage
     """
     
+    # Recommendation cache: bounded LRU, entries expire as search results change
+    _CACHE_MAXSIZE = 1024
+    _CACHE_TTL = 3600  # seconds
+    
+    # Query generation decoding: some variety in suggestions, and a token
+    # cap that fits three alternatives
+    _LLM_TEMPERATURE = 0.3
+    _LLM_MAX_TOKENS = 400
+    
     def __init__(self, name: str):
         super().__init__(name)
         self.youtube_service = None
         self.llm_client = None
-        self.cache = {}
+        self.cache = OrderedDict()  # key -> (stored_at, result)
         self._initialize_services()
     
     def _initialize_services(self):
         """Initialize external services (YouTube API, LLM)."""
         # Initialize YouTube Service
         try:
-            sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'backend', 'services'))
-            from youtube_service import YouTubeService
+            if YouTubeService is None:
+                raise _YOUTUBE_IMPORT_ERROR
             self.youtube_service = YouTubeService()
             self.log("YouTube service initialized")
         except Exception as e:
@@ -45,7 +118,8 @@ class RecommendationOptimizerAgent(BaseAgent):
 
         # Initialize LLM Client
         try:
-            from llm_client import get_llm_client
+            if get_llm_client is None:
+                raise _LLM_IMPORT_ERROR
             self.llm_client = get_llm_client("gemini")
             self.log("LLM client initialized")
         except Exception as e:
@@ -71,44 +145,192 @@ class RecommendationOptimizerAgent(BaseAgent):
             max_results = data.get("max_results", 3)
             
             # Check cache first
-            cache_key = f"{title}_{category}"
-            if cache_key in self.cache:
+            cache_key = f"{title.lower().strip()}|{category}"
+            cached = self._cache_get(cache_key)
+            if cached is not None:
                 self.log("Using cached recommendations")
-                return self.create_response("success", self.cache[cache_key])
+                return self.create_response("success", cached)
             
             # Generate search queries based on category
             search_queries = self._generate_search_queries(title, category)
             
-            # Search for alternatives
-            alternatives = []
-            for query in search_queries[:max_results]:
-                if self.youtube_service:
-                    # Use YouTube API
-                    results = self.youtube_service.search(query, max_results=1)
-                    if results:
-                        alternatives.append(self._format_youtube_result(results[0], query))
-                else:
-                    # Use mock alternatives
-                    alternatives.append(self._generate_mock_alternative(query))
+            # Search for alternatives (concurrently)
+            queries = search_queries[:max_results]
+            if self.youtube_service:
+                # Use YouTube API
+                results_list = self.youtube_service.search_many_sync(queries, max_results=1)
+                alternatives = [
+                    self._format_youtube_result(results[0], query)
+                    for query, results in zip(queries, results_list)
+                    if results
+                ]
+            else:
+                # Use mock alternatives
+                alternatives = [self._generate_mock_alternative(query) for query in queries]
             
-            # Ensure we have at least 3 alternatives
-            while len(alternatives) < 3:
-                alternatives.append(self._generate_mock_alternative(
-                    f"productive content {len(alternatives) + 1}"
-                ))
+            return self._finish_recommendations(cache_key, alternatives, max_results)
             
-            result = {"alternatives": alternatives[:max_results]}
+        except Exception as e:
+            return self.handle_error(e, "Recommendation generation")
+    
+    async def process_async(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Async variant of process().
+        
+        Query generation awaits the LLM, and the YouTube searches for all
+        queries run concurrently, so the search step takes as long as the
+        slowest query rather than the sum of all of them.
+        
+        Args:
+            data: Contains title, category, addiction_index
+        
+        Returns:
+            List of alternative content suggestions
+        """
+        self.log("Generating recommendations...")
+        
+        try:
+            title = data.get("title", "")
+            category = data.get("category", "unknown")
+            max_results = data.get("max_results", 3)
             
-            # Cache the result
-            self.cache[cache_key] = result
+            cache_key = f"{title.lower().strip()}|{category}"
+            cached = self._cache_get(cache_key)
+            if cached is not None:
+                self.log("Using cached recommendations")
+                return self.create_response("success", cached)
             
-            self.log(f"Generated {len(alternatives)} alternatives")
+            search_queries = await self._agenerate_search_queries(title, category)
+            queries = search_queries[:max_results]
             
-            return self.create_response("success", result)
+            if self.youtube_service:
+                results_list = await self.youtube_service.search_many(queries, max_results=1)
+                alternatives = [
+                    self._format_youtube_result(results[0], query)
+                    for query, results in zip(queries, results_list)
+                    if results
+                ]
+            else:
+                alternatives = [self._generate_mock_alternative(query) for query in queries]
             
+            return self._finish_recommendations(cache_key, alternatives, max_results)
+        
         except Exception as e:
             return self.handle_error(e, "Recommendation generation")
+    
+    def stream_recommendations(self, data: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """
+        Generate alternative recommendations one at a time.
+        
+        The LLM response is streamed and each alternative is searched and
+        yielded as soon as its JSON object is complete, so a caller can show
+        the first alternative before the rest are generated. Yields the same
+        alternatives process() returns, including padding, and caches them.
+        
+        Args:
+            data: Contains title, category, addiction_index
+        
+        Yields:
+            Alternative content suggestions
+        """
+        title = data.get("title", "")
+        category = data.get("category", "unknown")
+        max_results = data.get("max_results", 3)
+        
+        cache_key = f"{title.lower().strip()}|{category}"
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            self.log("Using cached recommendations")
+            yield from cached["alternatives"]
+            return
+        
+        alternatives = []
+        for query in self._stream_search_queries(title, category):
+            if len(alternatives) >= max_results:
+                break
+            if self.youtube_service:
+                results = self.youtube_service.search(query, max_results=1)
+                if not results:
+                    continue
+                alternative = self._format_youtube_result(results[0], query)
+            else:
+                alternative = self._generate_mock_alternative(query)
+            alternatives.append(alternative)
+            yield alternative
+        
+        streamed = len(alternatives)
+        result = self._finish_recommendations(cache_key, alternatives, max_results)
+        yield from result["data"]["alternatives"][streamed:]
+    
+    def _stream_search_queries(self, title: str, category: str) -> Iterator[str]:
+        """Yield search queries as the LLM streams its alternatives, or the defaults."""
+        if not self.llm_client:
+            self.log("LLM client not available, using default queries", "WARNING")
+            yield from _DEFAULT_QUERIES
+            return
+        
+        found = False
+        try:
+            system_prompt, user_prompt = self._search_query_prompts(title, category)
+            chunks = self.llm_client.stream(
+                system_prompt=system_prompt,
+                user_prompt=user_prompt,
+                temperature=self._LLM_TEMPERATURE,
+                max_tokens=self._LLM_MAX_TOKENS,
+                cache_system_prompt=True
+            )
+            for alt in iter_json_array_items(chunks, "alternatives"):
+                query = alt.get("search_query") if isinstance(alt, dict) else None
+                if query:
+                    found = True
+                    yield query
+        except Exception as e:
+            self.log(f"Error streaming queries with LLM: {e}", "ERROR")
+        
+        if not found:
+            yield from _DEFAULT_QUERIES
+    
+    def _finish_recommendations(
+        self,
+        cache_key: str,
+        alternatives: List[Dict[str, Any]],
+        max_results: int
+    ) -> Dict[str, Any]:
+        """Pad alternatives to at least 3, cache and wrap the result."""
+        # Ensure we have at least 3 alternatives
+        while len(alternatives) < 3:
+            alternatives.append(self._generate_mock_alternative(
+                f"productive content {len(alternatives) + 1}"
+            ))
+        
+        result = {"alternatives": alternatives[:max_results]}
+        
+        # Cache the result
+        self._cache_put(cache_key, result)
+        
+        self.logger.info("Generated %d alternatives", len(alternatives))
+        
+        return self.create_response("success", result)
 
+    def _cache_get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return a fresh cached result, or None."""
+        entry = self.cache.get(key)
+        if entry is None:
+            return None
+        stored_at, result = entry
+        if time.monotonic() - stored_at > self._CACHE_TTL:
+            del self.cache[key]
+            return None
+        self.cache.move_to_end(key)
+        return result
+    
+    def _cache_put(self, key: str, result: Dict[str, Any]):
+        """Cache a result, evicting the least recently used entry when full."""
+        self.cache[key] = (time.monotonic(), result)
+        self.cache.move_to_end(key)
+        if len(self.cache) > self._CACHE_MAXSIZE:
+            self.cache.popitem(last=False)
+    
     def _generate_search_queries(self, title: str, category: str) -> List[str]:
         """
         Generate search queries for productive alternatives using Gemini.
@@ -120,64 +342,95 @@ class RecommendationOptimizerAgent(BaseAgent):
         Returns:
             List of search queries
         """
-        # Default fallback queries
-        default_queries = [
-            "python programming tutorial for beginners",
-            "productivity tips for students",
-            "5 minute meditation for focus"
-        ]
-
         if not self.llm_client:
             self.log("LLM client not available, using default queries", "WARNING")
-            return default_queries
+            return list(_DEFAULT_QUERIES)
 
         try:
-            # Import prompts
-            sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'backend', 'core'))
-            from prompts import ROA_SYSTEM_PROMPT, format_roa_prompt
-            
-            # User preferences (could be fetched from a profile service in the future)
-            user_prefs = {
-                "interests": ["coding", "productivity", "meditation", "science"],
-                "preferred_languages": ["python", "java", "javascript", "english", "tamil"],
-                "goals": ["learn programming", "improve focus", "reduce screen time"]
-            }
-
-            # Format prompt
-            user_prompt = format_roa_prompt(
-                content={"title": title, "category": category},
-                addiction_index=75, # Default high index to trigger good suggestions
-                user_prefs=user_prefs
-            )
+            system_prompt, user_prompt = self._search_query_prompts(title, category)
 
             # Generate with LLM
             response = self.llm_client.generate(
-                system_prompt=ROA_SYSTEM_PROMPT,
+                system_prompt=system_prompt,
                 user_prompt=user_prompt,
-                temperature=0.7
+                temperature=self._LLM_TEMPERATURE,
+                max_tokens=self._LLM_MAX_TOKENS,
+                cache_system_prompt=True,  # ROA_SYSTEM_PROMPT is a fixed prefix
+                response_schema=ROAResult
             )
 
-            if not response:
-                return default_queries
+            return self._queries_from_response(response)
 
-            # Parse JSON response
-            data = self.llm_client.parse_json_response(response)
+        except Exception as e:
+            self.log(f"Error generating queries with LLM: {e}", "ERROR")
+            return list(_DEFAULT_QUERIES)
+    
+    async def _agenerate_search_queries(self, title: str, category: str) -> List[str]:
+        """Async variant of _generate_search_queries()."""
+        if not self.llm_client:
+            self.log("LLM client not available, using default queries", "WARNING")
+            return list(_DEFAULT_QUERIES)
+        
+        try:
+            system_prompt, user_prompt = self._search_query_prompts(title, category)
             
-            if not data or "alternatives" not in data:
-                return default_queries
-
-            # Extract search queries from the alternatives
-            queries = [alt.get("search_query") for alt in data["alternatives"] if alt.get("search_query")]
+            response = await self.llm_client.agenerate(
+                system_prompt=system_prompt,
+                user_prompt=user_prompt,
+                temperature=self._LLM_TEMPERATURE,
+                max_tokens=self._LLM_MAX_TOKENS,
+                cache_system_prompt=True,
+                response_schema=ROAResult
+            )
             
-            if not queries:
-                return default_queries
-                
-            self.log(f"Generated dynamic queries: {queries}")
-            return queries
-
+            return self._queries_from_response(response)
+        
         except Exception as e:
             self.log(f"Error generating queries with LLM: {e}", "ERROR")
-            return default_queries
+            return list(_DEFAULT_QUERIES)
+    
+    def _search_query_prompts(self, title: str, category: str) -> tuple:
+        """Return (system_prompt, user_prompt) for generating search queries."""
+        # User preferences (could be fetched from a profile service in the future)
+        user_prefs = {
+            "interests": ["coding", "productivity", "meditation", "science"],
+            "preferred_languages": ["python", "java", "javascript", "english", "tamil"],
+            "goals": ["learn programming", "improve focus", "reduce screen time"]
+        }
+        
+        # Format prompt
+        user_prompt = format_roa_prompt(
+            content={"title": title, "category": category},
+            addiction_index=75, # Default high index to trigger good suggestions
+            user_prefs=user_prefs
+        )
+        return ROA_SYSTEM_PROMPT, user_prompt
+    
+    def _queries_from_response(self, response: Optional[str]) -> List[str]:
+        """Extract search queries from an LLM response, or the defaults."""
+        if not response:
+            return list(_DEFAULT_QUERIES)
+        
+        # Parse JSON response
+        data = self.llm_client.parse_json_response(response)
+        
+        if not data or "alternatives" not in data:
+            return list(_DEFAULT_QUERIES)
+        
+        # Extract search queries from the alternatives
+        queries = [alt.get("search_query") for alt in data["alternatives"] if alt.get("search_query")]
+        
+        if not queries:
+            return list(_DEFAULT_QUERIES)
+        
+        self.logger.info("Generated dynamic queries: %s", queries)
+        return queries
+    
+    async def aclose(self):
+        """Close the YouTube service's pooled HTTP session."""
+        aclose = getattr(self.youtube_service, "aclose", None)
+        if aclose is not None:
+            await aclose()
     
     def _format_youtube_result(self, result: Dict[str, Any], query: str) -> Dict[str, Any]:
         """Format YouTube API result as alternative."""
@@ -192,47 +445,9 @@ class RecommendationOptimizerAgent(BaseAgent):
     
     def _generate_mock_alternative(self, query: str) -> Dict[str, Any]:
         """Generate mock alternative for testing."""
-        mock_alternatives = {
-            "study with me": {
-                "title": "Study With Me - 30 min Pomodoro Focus Session",
-                "url": "https://youtube.com/watch?v=demo_study",
-                "reason": "Structured study time with proven productivity technique",
-                "type": "video",
-                "estimated_duration": 1800
-            },
-            "meditation": {
-                "title": "5-Minute Meditation Break for Focus",
-                "url": "https://youtube.com/watch?v=demo_meditation",
-                "reason": "Quick mental reset to improve concentration",
-                "type": "guided_exercise",
-                "estimated_duration": 300
-            },
-            "tutorial": {
-                "title": "Python Basics - 10 Minute Tutorial",
-                "url": "https://youtube.com/watch?v=demo_python",
-                "reason": "Learn a valuable skill in short time",
-                "type": "video",
-                "estimated_duration": 600
-            },
-            "exercise": {
-                "title": "Quick Desk Exercises - 5 Minutes",
-                "url": "https://youtube.com/watch?v=demo_exercise",
-                "reason": "Physical activity to boost energy and focus",
-                "type": "guided_exercise",
-                "estimated_duration": 300
-            },
-            "productivity": {
-                "title": "3 Productivity Hacks That Actually Work",
-                "url": "https://youtube.com/watch?v=demo_productivity",
-                "reason": "Practical tips to improve daily efficiency",
-                "type": "video",
-                "estimated_duration": 480
-            }
-        }
-        
-        # Find matching mock alternative
+        # Find matching mock alternative (first key in table order wins)
         query_lower = query.lower()
-        for key, alt in mock_alternatives.items():
+        for key, alt in _MOCK_ALTERNATIVE_ITEMS:
             if key in query_lower:
                 return {**alt, "search_query": query}
         
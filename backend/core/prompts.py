@@ -5,6 +5,13 @@ Contains system and user prompts for all LLM-powered agents.
 Designed for Gemini but compatible with other LLMs (OpenAI, Claude, etc.)
 """
 
+import os
+import re
+import string
+from functools import lru_cache
+
+from backend.core.utils import dumps_json
+
 # ============================================================================
 # Content Classification Agent (CCA) Prompts
 # ============================================================================
@@ -87,6 +94,23 @@ CCA_FEW_SHOT_EXAMPLES = [
 ]
 
 
+def _render_few_shot(examples: list) -> str:
+    """Render few-shot examples as fixed text (key order as written)."""
+    return "\n\n".join(
+        f"Input: {dumps_json(ex['input'])}\nOutput: {dumps_json(ex['output'])}"
+        for ex in examples
+    )
+
+
+# Static CCA prefix: system prompt + few-shot examples, built once at import
+# so it is byte-identical on every request. Provider prompt caches (Gemini
+# cached content, Anthropic cache_control, OpenAI automatic prefix caching)
+# only hit on an exact prefix match; per-item data goes in the user prompt.
+CCA_SYSTEM_PROMPT_WITH_EXAMPLES = (
+    f"{CCA_SYSTEM_PROMPT}\n\nExamples:\n\n{_render_few_shot(CCA_FEW_SHOT_EXAMPLES)}"
+)
+
+
 # ============================================================================
 # Addiction Scoring Agent (ASA) Prompts
 # ============================================================================
@@ -272,39 +296,92 @@ Return ONLY JSON."""
 # Helper Functions
 # ============================================================================
 
+def _positional_template(template: str, fields: tuple) -> str:
+    """
+    Convert a str.format template into a positional %-format string.
+    
+    Formatting then takes one tuple instead of keyword arguments. fields
+    must name the template's replacement fields in order of appearance.
+    """
+    names = tuple(name for _, name, _, _ in string.Formatter().parse(template) if name is not None)
+    if names != fields:
+        raise ValueError(f"Template fields {names} do not match {fields}")
+    return re.sub(r"\{\w+\}", "%s", template.replace("%", "%%"))
+
+
+# %-format versions of the user prompt templates, built once at import
+_CCA_USER_FMT = _positional_template(CCA_USER_PROMPT_TEMPLATE, (
+    "title", "description", "channel", "duration_sec", "platform", "content_type",
+    "has_addictive_keywords", "has_educational_keywords", "has_clickbait_keywords"
+))
+_ASA_USER_FMT = _positional_template(ASA_USER_PROMPT_TEMPLATE, (
+    "classification_json", "session_minutes", "repeat_count", "time_of_day", "user_searched"
+))
+_ROA_USER_FMT = _positional_template(ROA_USER_PROMPT_TEMPLATE, (
+    "title", "category", "addiction_index", "user_preferences"
+))
+
+
+# Descriptions can run to several KB; classification needs only the start,
+# and prefill cost grows with prompt length
+MAX_CCA_DESC_CHARS = int(os.getenv("MAX_CCA_DESC_CHARS", "500"))
+
+# Shared default for missing context/indicators (never mutated), so items
+# without them don't allocate a fresh empty dict per lookup
+_EMPTY = {}
+
+
 def format_cca_prompt(metadata: dict) -> str:
-    """Format CCA user prompt with metadata."""
-    return CCA_USER_PROMPT_TEMPLATE.format(
-        title=metadata.get("title", ""),
-        description=metadata.get("description", ""),
-        channel=metadata.get("channel", "Unknown"),
-        duration_sec=metadata.get("duration_sec", 0),
-        platform=metadata.get("platform", "youtube"),
-        content_type=metadata.get("context", {}).get("content_type", "unknown"),
-        has_addictive_keywords=metadata.get("context", {}).get("title_indicators", {}).get("has_addictive_keywords", False),
-        has_educational_keywords=metadata.get("context", {}).get("title_indicators", {}).get("has_educational_keywords", False),
-        has_clickbait_keywords=metadata.get("context", {}).get("title_indicators", {}).get("has_clickbait_keywords", False)
+    """Format CCA user prompt with metadata (description truncated to MAX_CCA_DESC_CHARS)."""
+    context = metadata.get("context", _EMPTY)
+    indicators = context.get("title_indicators", _EMPTY)
+    fields = (
+        metadata.get("title", ""),
+        (metadata.get("description") or "")[:MAX_CCA_DESC_CHARS],
+        metadata.get("channel", "Unknown"),
+        metadata.get("duration_sec", 0),
+        metadata.get("platform", "youtube"),
+        context.get("content_type", "unknown"),
+        indicators.get("has_addictive_keywords", False),
+        indicators.get("has_educational_keywords", False),
+        indicators.get("has_clickbait_keywords", False)
+    )
+    try:
+        return _format_cca_prompt_cached(*fields)
+    except TypeError:
+        # Unhashable field value: format without caching
+        return _format_cca_prompt_cached.__wrapped__(*fields)
+
+
+# Repeated feed items (retries, re-renders) reuse the formatted prompt.
+# typed=True keeps e.g. 45 and 45.0 apart, since they format differently.
+@lru_cache(maxsize=512, typed=True)
+def _format_cca_prompt_cached(
+    title, description, channel, duration_sec, platform, content_type,
+    has_addictive_keywords, has_educational_keywords, has_clickbait_keywords
+) -> str:
+    return _CCA_USER_FMT % (
+        title, description, channel, duration_sec, platform, content_type,
+        has_addictive_keywords, has_educational_keywords, has_clickbait_keywords
     )
 
 
 def format_asa_prompt(classification: dict, behavioral_signals: dict) -> str:
     """Format ASA user prompt."""
-    import json
-    return ASA_USER_PROMPT_TEMPLATE.format(
-        classification_json=json.dumps(classification, indent=2),
-        session_minutes=behavioral_signals.get("session_minutes", 0),
-        repeat_count=behavioral_signals.get("repeat_count", 0),
-        time_of_day=behavioral_signals.get("time_of_day", "unknown"),
-        user_searched=behavioral_signals.get("user_searched", False)
+    return _ASA_USER_FMT % (
+        dumps_json(classification, indent=True),
+        behavioral_signals.get("session_minutes", 0),
+        behavioral_signals.get("repeat_count", 0),
+        behavioral_signals.get("time_of_day", "unknown"),
+        behavioral_signals.get("user_searched", False)
     )
 
 
 def format_roa_prompt(content: dict, addiction_index: int, user_prefs: dict = None) -> str:
     """Format ROA user prompt."""
-    import json
-    return ROA_USER_PROMPT_TEMPLATE.format(
-        title=content.get("title", ""),
-        category=content.get("category", "unknown"),
-        addiction_index=addiction_index,
-        user_preferences=json.dumps(user_prefs or {}, indent=2)
+    return _ROA_USER_FMT % (
+        content.get("title", ""),
+        content.get("category", "unknown"),
+        addiction_index,
+        dumps_json(user_prefs or {}, indent=True)
     )
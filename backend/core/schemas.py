@@ -0,0 +1,34 @@
+"""
+LLM Response Schemas for ZenFeed Agents
+
+Pydantic models mirroring the JSON each agent prompt asks for. Passed as
+response_schema to LLMClient.generate() so providers with structured
+output constrain decoding to valid JSON of this shape.
+"""
+
+from typing import List, Literal
+
+from pydantic import BaseModel
+
+
+class CCAResult(BaseModel):
+    """Content classification (CCA_SYSTEM_PROMPT)"""
+    category: Literal["educational", "productive", "neutral", "entertainment", "addictive", "harmful"]
+    reason: str
+    triggers: List[str]
+    thumbnail_sentiment: Literal["positive", "neutral", "negative", "clickbait"]
+    confidence: float
+
+
+class ROAAlternative(BaseModel):
+    """One suggested alternative (ROA_SYSTEM_PROMPT)"""
+    title: str
+    reason: str
+    search_query: str
+    type: Literal["video", "guided_exercise", "article", "course"]
+    estimated_duration: int
+
+
+class ROAResult(BaseModel):
+    """Recommendation alternatives (ROA_SYSTEM_PROMPT)"""
+    alternatives: List[ROAAlternative]
@@ -0,0 +1,60 @@
+"""
+Shared Helpers for ZenFeed Backend
+"""
+
+import json
+
+try:
+    import orjson  # Faster JSON encoding/decoding when available
+except ImportError:
+    orjson = None
+
+# Parse JSON from str or bytes. orjson.JSONDecodeError subclasses
+# json's, so callers catch one type
+loads_json = orjson.loads if orjson else json.loads
+
+
+def dumps_json(obj, indent: bool = False) -> str:
+    """
+    Serialize an object to JSON text.
+    
+    Uses orjson when it is installed. Output is UTF-8 (not ASCII-escaped)
+    and compact unless indented; indented output matches json.dumps(indent=2).
+    
+    Args:
+        obj: JSON-serializable object
+        indent: Indent nested values by two spaces
+    
+    Returns:
+        JSON string
+    """
+    if orjson:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0).decode()
+    if indent:
+        return json.dumps(obj, indent=2, ensure_ascii=False)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+def api_json_model():
+    """
+    Build a googleapiclient response model that decodes with loads_json.
+    
+    Pass as build(..., model=api_json_model()) so API client responses
+    (e.g. videos.list batches of 50) skip the stdlib JSON decoder.
+    
+    Returns:
+        googleapiclient.model.JsonModel instance
+    """
+    from googleapiclient.model import JsonModel
+    
+    class FastJsonModel(JsonModel):
+        def deserialize(self, content):
+            try:
+                body = loads_json(content)
+            except ValueError:
+                return content.decode("utf-8") if isinstance(content, bytes) else content
+            if self._data_wrapper and "data" in body:
+                body = body["data"]
+            return body
+    
+    return FastJsonModel()
@@ -1,14 +1,31 @@
 # backend/services/addiction_service.py
-import os, joblib, numpy as np
-from typing import Dict
+import os, re, threading, joblib, numpy as np
+from bisect import bisect_right
+from typing import Dict, List, Optional
 
 ADD_MODEL_PATH = os.getenv("ADDICTION_MODEL_OUT", "ml_models/addiction_model.pkl")
 _add_model = None
 
+# One case-insensitive scan for compilation-style titles ("compil" also
+# covers "compilation"); ASCII folding matches str.lower() for these keywords
+_COMPILATION_RE = re.compile(r"compil|meme|best of", re.IGNORECASE | re.ASCII)
+
+# Risk buckets: index >= threshold moves up one level
+_RISK_THRESHOLDS = np.array([30, 60, 80])
+_RISK_LEVELS = ("low", "moderate", "high", "critical")
+
+# Per-thread (1, 4) feature row reused by single-item scoring
+_local = threading.local()
+
 def load_add_model():
     global _add_model
     if _add_model is None:
-        _add_model = joblib.load(ADD_MODEL_PATH)
+        # mmap: the forest's arrays are paged in from the file and shared
+        # between worker processes instead of copied into each one
+        model = joblib.load(ADD_MODEL_PATH, mmap_mode="r")
+        # Warm-up predict so the first request doesn't pay the page faults
+        model.predict(np.zeros((1, 4)))
+        _add_model = model
     return _add_model
 
 def compute_addiction_score(item: Dict, user_context: Dict=None) -> Dict:
@@ -16,24 +33,44 @@ def compute_addiction_score(item: Dict, user_context: Dict=None) -> Dict:
     item: { duration_sec, title, description, transcript }
     user_context: { repeat_watch, recent_session_minutes }
     returns: { addiction_index: int, risk_level: str }
+    Single-row path: features are written into a reused per-thread buffer
+    (use compute_addiction_scores for several items)
     """
     model = load_add_model()
+    row = getattr(_local, "row", None)
+    if row is None:
+        row = _local.row = np.empty((1, 4), dtype=np.float64)
+    row[0] = _features(item, user_context)
+    idx = int(np.clip(np.rint(model.predict(row)[0]), 0, 100))
+    return {"addiction_index": idx, "risk_level": _RISK_LEVELS[bisect_right(_RISK_THRESHOLDS, idx)]}
+
+def _features(item: Dict, user_context: Optional[Dict]) -> tuple:
     # simple engineered features
     duration = int(item.get("duration_sec", 0))
-    title = item.get("title","").lower()
-    is_compilation = int(any(k in title for k in ["compilation","meme","best of","compil"]))
+    is_compilation = int(_COMPILATION_RE.search(item.get("title","")) is not None)
     view_count = int(item.get("viewCount", 0) or 0)
     repeat_watch = int(user_context.get("repeat_watch", 0) if user_context else 0)
+    return (duration, is_compilation, view_count, repeat_watch)
 
-    X = [[duration, is_compilation, view_count, repeat_watch]]
-    pred = model.predict(X)[0]
-    idx = int(max(0, min(100, round(pred))))
-    if idx >= 80:
-        level = "critical"
-    elif idx >= 60:
-        level = "high"
-    elif idx >= 30:
-        level = "moderate"
-    else:
-        level = "low"
-    return {"addiction_index": idx, "risk_level": level}
+def compute_addiction_scores(items: List[Dict], user_contexts: List[Optional[Dict]] = None) -> List[Dict]:
+    """
+    Score several items with one model.predict call, so sklearn's per-call
+    validation overhead is paid once per batch instead of once per item.
+    user_contexts: one per item (or None for no context)
+    returns: [{ addiction_index: int, risk_level: str }] in input order
+    """
+    if not items:
+        return []
+    model = load_add_model()
+    if user_contexts is None:
+        user_contexts = [None] * len(items)
+    # float64: view counts exceed float32's exact integer range
+    X = np.array([_features(item, ctx) for item, ctx in zip(items, user_contexts)], dtype=np.float64)
+    preds = model.predict(X)
+    # rint rounds half to even, like round()
+    idxs = np.clip(np.rint(preds), 0, 100).astype(int)
+    levels = np.searchsorted(_RISK_THRESHOLDS, idxs, side="right")
+    return [
+        {"addiction_index": idx, "risk_level": _RISK_LEVELS[level]}
+        for idx, level in zip(idxs.tolist(), levels.tolist())
+    ]
@@ -1,27 +1,50 @@
 # backend/services/classification_service.py
 import os, joblib
-from typing import Dict
+from typing import Dict, List
 
 TEXT_MODEL_PATH = os.getenv("TEXT_MODEL_OUT", "ml_models/text_classifier.pkl")
+# Only the leading words reach the vectorizer, so long transcripts don't
+# dominate tokenization and vocabulary lookup
+MAX_TEXT_TOKENS = int(os.getenv("TEXT_MODEL_MAX_TOKENS", "256"))
 _text_model = None
 
 def load_text_model():
     global _text_model
     if _text_model is None:
-        _text_model = joblib.load(TEXT_MODEL_PATH)
+        # mmap: vectorizer/classifier arrays are paged in from the file and
+        # shared between worker processes instead of copied into each one
+        model = joblib.load(TEXT_MODEL_PATH, mmap_mode="r")
+        # Warm-up predict so the first request doesn't pay the page faults
+        model.predict([""])
+        _text_model = model
     return _text_model
 
+def _model_text(item: Dict) -> str:
+    text = item.get("title","") + " " + item.get("description","") + " " + item.get("transcript","")
+    # maxsplit stops splitting once enough words are found
+    return " ".join(text.split(None, MAX_TEXT_TOKENS)[:MAX_TEXT_TOKENS])
+
 def classify_content(item: Dict) -> Dict:
     """
     item: { title, description, transcript (optional) }
     returns: {category, probs, confidence}
     """
+    return classify_content_batch([item])[0]
+
+def classify_content_batch(items: List[Dict]) -> List[Dict]:
+    """
+    Classify several items with one predict/predict_proba call each, so the
+    vectorizer and model run once per batch instead of once per item.
+    returns: [{category, confidence}] in input order
+    """
     model = load_text_model()
-    text = (item.get("title","") + " " + item.get("description","") + " " + item.get("transcript",""))
-    pred = model.predict([text])[0]
-    probs = None
+    texts = [_model_text(item) for item in items]
+    preds = model.predict(texts)
     try:
-        probs = model.predict_proba([text])[0].tolist()
+        confidences = [max(p) for p in model.predict_proba(texts).tolist()]
     except Exception:
-        probs = None
-    return {"category": pred, "confidence": None if probs is None else max(probs)}
+        confidences = [None] * len(texts)
+    return [
+        {"category": pred, "confidence": confidence}
+        for pred, confidence in zip(preds, confidences)
+    ]
@@ -2,12 +2,23 @@
 import re
 from urllib.parse import parse_qs, urlparse
 
-from .yt_client import fetch_video_metadata, fetch_video_transcript
+from .yt_client import fetch_transcripts_batch, fetch_video_metadata, fetch_video_metadata_batch, fetch_video_transcript
+
+# URL with a query but no fragment, %-escapes, "+" or whitespace: its query
+# is everything after the first "?" and parse_qs would not rewrite it
+_PLAIN_QUERY_RE = re.compile(r"[^?#%+\s]*\?([^#%+\s]*)\Z")
 
 def extract_video_id_from_url(url: str):
     # supports youtube watch urls and youtu.be
     if "youtu.be/" in url:
         return url.split("youtu.be/")[-1].split("?")[0]
+    # fast path for plain watch urls: first non-empty v= without urlparse/parse_qs
+    m = _PLAIN_QUERY_RE.match(url)
+    if m:
+        for param in m.group(1).split("&"):
+            if param.startswith("v=") and len(param) > 2:
+                return param[2:]
+        return None
     qs = parse_qs(urlparse(url).query)
     return qs.get("v", [None])[0]
 
@@ -19,3 +30,25 @@ def ingest_from_url(url: str):
     transcript = fetch_video_transcript(vid)
     meta["transcript"] = transcript
     return meta
+
+def ingest_from_urls(urls):
+    """
+    Batch form of ingest_from_url: metadata for all URLs comes from one
+    videos.list request per 50 videos and transcripts are fetched in
+    parallel. returns: results in input order
+    """
+    vids = [extract_video_id_from_url(url) for url in urls]
+    metas = fetch_video_metadata_batch([vid for vid in vids if vid])
+    transcripts = fetch_transcripts_batch(list(metas))
+    results = []
+    for url, vid in zip(urls, vids):
+        if not vid:
+            results.append({"error": "invalid_url", "url": url})
+            continue
+        meta = dict(metas[vid]) if vid in metas else None
+        if meta is None:
+            results.append({"error": "not_found", "url": url})
+            continue
+        meta["transcript"] = transcripts[vid]
+        results.append(meta)
+    return results
@@ -6,16 +6,239 @@ Provides unified interface for all agents.
 """
 
 import os
+import re
 import json
+import time
+import asyncio
+import hashlib
 import logging
-from typing import Dict, Any, Optional
-from dotenv import load_dotenv
+import importlib.util
+import threading
+from collections import OrderedDict
+from datetime import timedelta
+from functools import lru_cache
+from typing import Dict, Any, Iterable, Iterator, List, Optional
 
-# Load environment variables
-load_dotenv()
+from pydantic import create_model
+
+from backend.core.utils import dumps_json, loads_json
+
+# Load environment variables (python-dotenv is optional; the process
+# environment still applies without it)
+try:
+    from dotenv import load_dotenv
+    load_dotenv()
+except ImportError:
+    pass
 
 logger = logging.getLogger("ZenFeed.LLMClient")
 
+# User message wrapping several prompts into one batched request
+BATCH_PROMPT_TEMPLATE = """Answer each of the following {count} requests independently.
+Return ONLY a JSON object {{"results": [...]}} whose "results" array has exactly {count} elements, where element i is the JSON answer to request i.
+
+Requests:
+{requests_json}"""
+
+
+@lru_cache(maxsize=None)
+def _batch_response_schema(response_schema: type) -> type:
+    """Schema of a batched answer: {"results": [response_schema, ...]}."""
+    return create_model(
+        f"{response_schema.__name__}Batch",
+        results=(List[response_schema], ...)
+    )
+
+
+# Characters that matter when locating JSON values inside free text
+_JSON_STRUCTURE_RE = re.compile(r'[{}\[\]"\\]')
+# Trailing comma before a closing bracket (a common LLM JSON slip)
+_TRAILING_COMMA_RE = re.compile(r",(\s*[}\]])")
+
+
+def _json_spans(text: str) -> Iterator[tuple]:
+    """
+    Yield (start, end) of each top-level balanced {...} or [...] in text.
+    
+    One pass over the structural characters only. Quotes are tracked
+    inside a value (so braces in strings don't count) but ignored in the
+    surrounding prose.
+    """
+    depth = 0
+    start = 0
+    in_string = False
+    skip_to = 0  # index after an escaped character
+    
+    for match in _JSON_STRUCTURE_RE.finditer(text):
+        i = match.start()
+        if i < skip_to:
+            continue
+        ch = text[i]
+        if depth == 0:
+            if ch == "{" or ch == "[":
+                start = i
+                depth = 1
+        elif in_string:
+            if ch == "\\":
+                skip_to = i + 2
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch == "{" or ch == "[":
+            depth += 1
+        elif ch == "}" or ch == "]":
+            depth -= 1
+            if depth == 0:
+                yield start, i + 1
+
+
+def iter_json_array_items(chunks: Iterable[str], key: str) -> Iterator[Dict[str, Any]]:
+    """
+    Yield the objects of a JSON array while its text is still streaming in.
+    
+    Scans for the array under ``"key": [`` and emits each top-level
+    ``{...}`` element as soon as its closing brace arrives, tracking brace
+    depth and skipping braces inside strings. Each character is scanned
+    once; elements that fail to parse are skipped.
+    
+    Args:
+        chunks: Text chunks of a JSON response (e.g. from LLMClient.stream())
+        key: Name of the array to read
+    
+    Yields:
+        Parsed array elements, in order
+    """
+    marker = f'"{key}"'
+    buffer = ""
+    pos = -1  # next index to scan; -1 until the array is found
+    depth = 0
+    item_start = 0
+    in_string = False
+    escaped = False
+    
+    for chunk in chunks:
+        buffer += chunk
+        if pos < 0:
+            found = buffer.find(marker)
+            bracket = buffer.find("[", found + len(marker)) if found >= 0 else -1
+            if bracket < 0:
+                continue
+            pos = bracket + 1
+        
+        while pos < len(buffer):
+            ch = buffer[pos]
+            if in_string:
+                if escaped:
+                    escaped = False
+                elif ch == "\\":
+                    escaped = True
+                elif ch == '"':
+                    in_string = False
+            elif ch == '"':
+                in_string = True
+            elif ch == "{":
+                if depth == 0:
+                    item_start = pos
+                depth += 1
+            elif ch == "}":
+                depth -= 1
+                if depth == 0:
+                    try:
+                        yield loads_json(buffer[item_start:pos + 1])
+                    except json.JSONDecodeError:
+                        logger.warning("Skipping unparsable streamed array element")
+            elif ch == "]" and depth == 0:
+                return
+            pos += 1
+
+
+# Canned mock results (no API key)
+_MOCK_RESULTS = {
+    "classify_addictive": {
+        "category": "addictive",
+        "reason": "Short-form compilation triggers dopamine loops",
+        "triggers": ["short_duration", "compilation", "humor"],
+        "thumbnail_sentiment": "clickbait",
+        "confidence": 0.89
+    },
+    "classify_educational": {
+        "category": "educational",
+        "reason": "Tutorial content for skill development",
+        "triggers": [],
+        "thumbnail_sentiment": "positive",
+        "confidence": 0.92
+    },
+    "classify_neutral": {
+        "category": "neutral",
+        "reason": "General content without strong indicators",
+        "triggers": [],
+        "thumbnail_sentiment": "neutral",
+        "confidence": 0.65
+    },
+    "score": {
+        "addiction_index": 72,
+        "major_factors": ["short_duration", "compilation", "repeat_viewing"],
+        "risk_level": "high",
+        "recommended_action": "blur"
+    },
+    "alternatives": {
+        "alternatives": [
+            {
+                "title": "Study With Me - 30 min Pomodoro Focus Session",
+                "reason": "Productive alternative with structured time",
+                "search_query": "study with me pomodoro 30 minutes",
+                "type": "video",
+                "estimated_duration": 1800
+            },
+            {
+                "title": "5-Minute Meditation Break for Focus",
+                "reason": "Quick mental reset to improve concentration",
+                "search_query": "5 minute meditation focus",
+                "type": "guided_exercise",
+                "estimated_duration": 300
+            },
+            {
+                "title": "Python Basics - 10 Minute Tutorial",
+                "reason": "Learn a valuable skill in short time",
+                "search_query": "python tutorial 10 minutes beginner",
+                "type": "video",
+                "estimated_duration": 600
+            }
+        ]
+    },
+    "behavior": {
+        "user_summary": {
+            "avg_daily_addictive_minutes": 45,
+            "streak_days": 3,
+            "trend": "increasing"
+        },
+        "early_warning": True,
+        "suggested_intervention_schedule": "Increase nudges during evening hours (6-10 PM)",
+        "insights": [
+            "Late-night usage pattern detected",
+            "Increased short-form content consumption",
+            "Declining engagement with educational content"
+        ]
+    },
+    "ui": {
+        "intervention_type": "blur",
+        "overlay_text": "Take a mindful break 🧘",
+        "cta_buttons": [
+            {"label": "Show Alternatives", "action_key": "show_alternatives"},
+            {"label": "Reveal Content", "action_key": "reveal"}
+        ],
+        "css_snippet": "",
+        "timer_seconds": None
+    },
+    "default": {
+        "status": "mock",
+        "message": "Mock LLM response (no API key configured)"
+    }
+}
+# Serialized once at import, so a mock call costs only the trigger checks
+_MOCK_RESPONSES = {name: dumps_json(obj) for name, obj in _MOCK_RESULTS.items()}
+
 
 class LLMClient:
     """
@@ -25,8 +248,36 @@ class LLMClient:
     - Google Gemini
     - OpenAI GPT
     - Anthropic Claude (fallback)
+    
+    One instance is shared per provider (see get_llm_client) and is safe
+    to call from several threads and coroutines: provider clients and
+    their connection pools are thread-safe, the response cache is locked,
+    and micro-batch state is only touched from the event loop.
     """
     
+    # Seconds to wait for each streamed Gemini chunk (async path)
+    GEMINI_CHUNK_TIMEOUT = 15.0
+    
+    # Exact-match response cache bounds
+    _RESPONSE_CACHE_MAXSIZE = 10000
+    _RESPONSE_CACHE_TTL = 3600  # seconds
+    
+    # Micro-batching of concurrent agenerate_batched() calls: a batch is sent
+    # when it reaches BATCH_MAX_SIZE prompts or BATCH_TIMEOUT seconds after
+    # its first prompt arrived, whichever comes first
+    BATCH_MAX_SIZE = 8
+    BATCH_TIMEOUT = 0.05
+    
+    # Every agent prompt asks for a JSON answer: request provider-side JSON
+    # output (Gemini response_mime_type, OpenAI json_object) so replies come
+    # back without prose or markdown fences
+    JSON_RESPONSES = True
+    
+    # HTTP connection pool for the OpenAI/Anthropic SDKs: connections (and
+    # their TLS sessions) are kept alive and reused across calls
+    HTTP_MAX_CONNECTIONS = 32
+    HTTP_TIMEOUT = 30.0
+    
     def __init__(self, provider: str = "gemini"):
         """
         Initialize LLM client.
@@ -38,6 +289,48 @@ class LLMClient:
         self.api_key = self._get_api_key()
         self.client = self._initialize_client()
         
+        # Provider calls bound once, so generate()/agenerate() don't branch
+        # on the provider name per call. All share one signature:
+        # (system_prompt, user_prompt, temperature, max_tokens, cache_system_prompt,
+        # response_schema); the streaming ones take all but response_schema
+        self._generate_fn = {
+            "gemini": self._generate_gemini,
+            "openai": self._generate_openai,
+            "anthropic": self._generate_anthropic
+        }[self.provider]
+        # No async client wired up for OpenAI/Anthropic: their blocking call
+        # runs in a worker thread
+        self._agenerate_fn = (
+            self._agenerate_gemini if self.provider == "gemini" else self._agenerate_in_thread
+        )
+        self._stream_fn = {
+            "gemini": self._iter_gemini,
+            "openai": self._iter_openai,
+            "anthropic": self._iter_anthropic
+        }[self.provider]
+        
+        self._openai_options = (
+            {"response_format": {"type": "json_object"}} if self.JSON_RESPONSES else {}
+        )
+        
+        # Gemini explicit prompt caches: system_prompt -> (refresh_at, model or None)
+        self._gemini_prompt_caches: Dict[str, tuple] = {}
+        
+        # Exact-match response cache: request hash -> (stored_at, text), LRU
+        # with TTL. Locked because sync callers reach generate() from
+        # worker threads.
+        self._responses = OrderedDict()
+        self._responses_lock = threading.Lock()
+        self._cache_hits = 0
+        self._cache_misses = 0
+        
+        # Open micro-batches: (system_prompt, temperature, max_tokens,
+        # cache_system_prompt, response_schema) -> [(user_prompt, future)],
+        # plus their timers
+        self._pending_batches: Dict[tuple, list] = {}
+        self._batch_timers: Dict[tuple, asyncio.TimerHandle] = {}
+        self._batch_tasks = set()
+        
         logger.info(f"LLM Client initialized with provider: {self.provider}")
     
     def _get_api_key(self) -> str:
@@ -70,11 +363,11 @@ class LLMClient:
             
             elif self.provider == "openai":
                 from openai import OpenAI
-                return OpenAI(api_key=self.api_key)
+                return OpenAI(api_key=self.api_key, http_client=self._pooled_http_client())
             
             elif self.provider == "anthropic":
                 from anthropic import Anthropic
-                return Anthropic(api_key=self.api_key)
+                return Anthropic(api_key=self.api_key, http_client=self._pooled_http_client())
             
         except ImportError as e:
             logger.error(f"Failed to import {self.provider} library: {e}")
@@ -83,21 +376,52 @@ class LLMClient:
             logger.error(f"Failed to initialize {self.provider} client: {e}")
             return None
     
+    def _pooled_http_client(self):
+        """
+        Build the keep-alive httpx client handed to the OpenAI/Anthropic SDKs.
+        
+        HTTP/2 (one multiplexed connection for concurrent calls) is used
+        when the h2 package is installed.
+        """
+        import httpx
+        
+        return httpx.Client(
+            limits=httpx.Limits(
+                max_connections=self.HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=self.HTTP_MAX_CONNECTIONS
+            ),
+            timeout=self.HTTP_TIMEOUT,
+            http2=importlib.util.find_spec("h2") is not None
+        )
+    
     def generate(
         self,
         system_prompt: str,
         user_prompt: str,
         temperature: float = 0.7,
-        max_tokens: int = 500
+        max_tokens: int = 500,
+        cache_system_prompt: bool = False,
+        response_schema: Optional[type] = None
     ) -> Optional[str]:
         """
         Generate completion from LLM.
         
+        Identical requests (same provider, prompts, temperature and
+        max_tokens) within the cache TTL are answered from the response
+        cache without an API call.
+        
         Args:
             system_prompt: System instruction
             user_prompt: User message
             temperature: Sampling temperature (0-1)
             max_tokens: Maximum tokens to generate
+            cache_system_prompt: Serve the system prompt from a provider-side
+                prompt cache (Gemini cached content, Anthropic cache_control;
+                OpenAI caches stable prefixes automatically); it must be
+                byte-identical across calls
+            response_schema: Pydantic model the answer must match; Gemini
+                (response_schema) and Anthropic (forced tool use) constrain
+                decoding to it, other providers fall back to JSON mode
             
         Returns:
             Generated text or None if failed
@@ -106,43 +430,561 @@ class LLMClient:
             logger.warning("No LLM client available, using mock response")
             return self._mock_response(user_prompt)
         
+        key = self._response_key(system_prompt, user_prompt, temperature, max_tokens)
+        cached = self._response_get(key)
+        if cached is not None:
+            return cached
+        
         try:
-            if self.provider == "gemini":
-                return self._generate_gemini(system_prompt, user_prompt, temperature)
-            
-            elif self.provider == "openai":
-                return self._generate_openai(system_prompt, user_prompt, temperature, max_tokens)
-            
-            elif self.provider == "anthropic":
-                return self._generate_anthropic(system_prompt, user_prompt, temperature, max_tokens)
+            text = self._generate_fn(
+                system_prompt, user_prompt, temperature, max_tokens,
+                cache_system_prompt, response_schema
+            )
+        except Exception as e:
+            logger.error(f"LLM generation failed: {e}")
+            return self._mock_response(user_prompt)
+        
+        self._response_put(key, text)
+        return text
+    
+    async def agenerate(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: float = 0.7,
+        max_tokens: int = 500,
+        cache_system_prompt: bool = False,
+        response_schema: Optional[type] = None
+    ) -> Optional[str]:
+        """
+        Generate completion from LLM without blocking the event loop.
+        
+        Args:
+            system_prompt: System instruction
+            user_prompt: User message
+            temperature: Sampling temperature (0-1)
+            max_tokens: Maximum tokens to generate
+            cache_system_prompt: See generate()
+            response_schema: See generate()
             
+        Returns:
+            Generated text or None if failed
+        """
+        if not self.client:
+            logger.warning("No LLM client available, using mock response")
+            return self._mock_response(user_prompt)
+        
+        key = self._response_key(system_prompt, user_prompt, temperature, max_tokens)
+        cached = self._response_get(key)
+        if cached is not None:
+            return cached
+        
+        try:
+            text = await self._agenerate_fn(
+                system_prompt, user_prompt, temperature, max_tokens,
+                cache_system_prompt, response_schema
+            )
         except Exception as e:
             logger.error(f"LLM generation failed: {e}")
             return self._mock_response(user_prompt)
+        
+        self._response_put(key, text)
+        return text
+    
+    def stream(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: float = 0.7,
+        max_tokens: int = 500,
+        cache_system_prompt: bool = False
+    ) -> Iterator[str]:
+        """
+        Generate completion from LLM, yielding text chunks as they arrive.
+        
+        A cached response is yielded as a single chunk. A stream that runs
+        to completion is stored in the response cache, so generate() with
+        the same arguments is answered from it.
+        
+        Args:
+            system_prompt: System instruction
+            user_prompt: User message
+            temperature: Sampling temperature (0-1)
+            max_tokens: Maximum tokens to generate
+            cache_system_prompt: See generate()
+        
+        Yields:
+            Text chunks of the response
+        """
+        if not self.client:
+            logger.warning("No LLM client available, using mock response")
+            yield self._mock_response(user_prompt)
+            return
+        
+        key = self._response_key(system_prompt, user_prompt, temperature, max_tokens)
+        cached = self._response_get(key)
+        if cached is not None:
+            yield cached
+            return
+        
+        parts = []
+        try:
+            for text in self._stream_fn(
+                system_prompt, user_prompt, temperature, max_tokens, cache_system_prompt
+            ):
+                parts.append(text)
+                yield text
+        except Exception as e:
+            logger.error(f"LLM streaming failed: {e}")
+            if not parts:
+                yield self._mock_response(user_prompt)
+            return
+        
+        self._response_put(key, "".join(parts))
+    
+    async def _agenerate_in_thread(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: float,
+        max_tokens: int,
+        cache_system_prompt: bool = False,
+        response_schema: Optional[type] = None
+    ) -> str:
+        """Run the provider's blocking call in a worker thread."""
+        return await asyncio.to_thread(
+            self._generate_fn, system_prompt, user_prompt,
+            temperature, max_tokens, cache_system_prompt, response_schema
+        )
+    
+    def _response_key(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: float,
+        max_tokens: int
+    ) -> str:
+        """Hash a request into a fixed-size response cache key."""
+        raw = "\x1f".join((self.provider, system_prompt, user_prompt, repr(temperature), str(max_tokens)))
+        return hashlib.sha256(raw.encode()).hexdigest()
+    
+    def _response_get(self, key: str) -> Optional[str]:
+        """Return a fresh cached response, or None."""
+        with self._responses_lock:
+            entry = self._responses.get(key)
+            if entry is not None:
+                stored_at, text = entry
+                if time.monotonic() - stored_at <= self._RESPONSE_CACHE_TTL:
+                    self._responses.move_to_end(key)
+                    self._cache_hits += 1
+                    return text
+                del self._responses[key]
+            self._cache_misses += 1
+            return None
+    
+    def _response_put(self, key: str, text: Optional[str]):
+        """Cache a provider response, evicting the least recently used entry when full."""
+        if text is None:
+            return
+        with self._responses_lock:
+            self._responses[key] = (time.monotonic(), text)
+            self._responses.move_to_end(key)
+            if len(self._responses) > self._RESPONSE_CACHE_MAXSIZE:
+                self._responses.popitem(last=False)
+    
+    def cache_stats(self) -> Dict[str, Any]:
+        """
+        Get response cache statistics.
+        
+        Returns:
+            Hits, misses, hit rate and current/maximum size
+        """
+        with self._responses_lock:
+            lookups = self._cache_hits + self._cache_misses
+            return {
+                "hits": self._cache_hits,
+                "misses": self._cache_misses,
+                "hit_rate": self._cache_hits / lookups if lookups else 0.0,
+                "size": len(self._responses),
+                "maxsize": self._RESPONSE_CACHE_MAXSIZE
+            }
+    
+    def generate_batch(
+        self,
+        system_prompt: str,
+        user_prompts: List[str],
+        temperature: float = 0.7,
+        max_tokens: int = 500,
+        cache_system_prompt: bool = False,
+        response_schema: Optional[type] = None
+    ) -> List[Optional[str]]:
+        """
+        Generate completions for several user prompts with one LLM call.
+        
+        The prompts are sent as a JSON array and the model answers with an
+        array of JSON results. Prompts already in the response cache are
+        not sent. If the batched answer cannot be used, each prompt is
+        retried on its own.
+        
+        Args:
+            system_prompt: System instruction shared by all prompts
+            user_prompts: User messages
+            temperature: Sampling temperature (0-1)
+            max_tokens: Maximum tokens to generate per prompt
+            cache_system_prompt: See generate()
+            response_schema: Pydantic model of one answer (see generate());
+                a batched call is constrained to {"results": [model, ...]}
+        
+        Returns:
+            Generated text per prompt (JSON text for batched answers)
+        """
+        keys, results, missing = self._split_cached(system_prompt, user_prompts, temperature, max_tokens)
+        if len(missing) == 1:
+            i = missing[0]
+            results[i] = self.generate(
+                system_prompt, user_prompts[i], temperature, max_tokens,
+                cache_system_prompt, response_schema
+            )
+        elif missing:
+            prompts = [user_prompts[i] for i in missing]
+            response = self.generate(
+                system_prompt, self._batch_prompt(prompts), temperature,
+                max_tokens * len(prompts), cache_system_prompt,
+                _batch_response_schema(response_schema) if response_schema else None
+            )
+            texts = self._split_batch_response(response, len(prompts))
+            if texts is None:
+                texts = [
+                    self.generate(
+                        system_prompt, prompt, temperature, max_tokens,
+                        cache_system_prompt, response_schema
+                    )
+                    for prompt in prompts
+                ]
+            self._fill_batch(keys, results, missing, texts)
+        return results
+    
+    async def agenerate_batch(
+        self,
+        system_prompt: str,
+        user_prompts: List[str],
+        temperature: float = 0.7,
+        max_tokens: int = 500,
+        cache_system_prompt: bool = False,
+        response_schema: Optional[type] = None
+    ) -> List[Optional[str]]:
+        """Async variant of generate_batch()."""
+        keys, results, missing = self._split_cached(system_prompt, user_prompts, temperature, max_tokens)
+        if len(missing) == 1:
+            i = missing[0]
+            results[i] = await self.agenerate(
+                system_prompt, user_prompts[i], temperature, max_tokens,
+                cache_system_prompt, response_schema
+            )
+        elif missing:
+            prompts = [user_prompts[i] for i in missing]
+            response = await self.agenerate(
+                system_prompt, self._batch_prompt(prompts), temperature,
+                max_tokens * len(prompts), cache_system_prompt,
+                _batch_response_schema(response_schema) if response_schema else None
+            )
+            texts = self._split_batch_response(response, len(prompts))
+            if texts is None:
+                texts = await asyncio.gather(*(
+                    self.agenerate(
+                        system_prompt, prompt, temperature, max_tokens,
+                        cache_system_prompt, response_schema
+                    )
+                    for prompt in prompts
+                ))
+            self._fill_batch(keys, results, missing, texts)
+        return results
+    
+    async def agenerate_batched(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: float = 0.7,
+        max_tokens: int = 500,
+        cache_system_prompt: bool = False,
+        response_schema: Optional[type] = None
+    ) -> Optional[str]:
+        """
+        agenerate() for one prompt, coalesced with concurrent calls.
+        
+        Calls with the same system prompt and parameters that arrive within
+        BATCH_TIMEOUT of each other are sent together through
+        agenerate_batch() (up to BATCH_MAX_SIZE prompts per LLM call).
+        
+        Args:
+            system_prompt: System instruction
+            user_prompt: User message
+            temperature: Sampling temperature (0-1)
+            max_tokens: Maximum tokens to generate
+            cache_system_prompt: See generate()
+            response_schema: See agenerate_batch()
+        
+        Returns:
+            Generated text or None if failed
+        """
+        if not self.client:
+            logger.warning("No LLM client available, using mock response")
+            return self._mock_response(user_prompt)
+        
+        batch_key = (system_prompt, temperature, max_tokens, cache_system_prompt, response_schema)
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        pending = self._pending_batches.setdefault(batch_key, [])
+        pending.append((user_prompt, future))
+        if len(pending) >= self.BATCH_MAX_SIZE:
+            self._flush_batch(batch_key)
+        elif len(pending) == 1:
+            self._batch_timers[batch_key] = loop.call_later(
+                self.BATCH_TIMEOUT, self._flush_batch, batch_key
+            )
+        return await future
+    
+    def _flush_batch(self, batch_key: tuple):
+        """Send an open micro-batch (on size or timeout)."""
+        timer = self._batch_timers.pop(batch_key, None)
+        if timer is not None:
+            timer.cancel()
+        batch = self._pending_batches.pop(batch_key, None)
+        if batch:
+            task = asyncio.ensure_future(self._run_batch(batch_key, batch))
+            self._batch_tasks.add(task)
+            task.add_done_callback(self._batch_tasks.discard)
+    
+    async def _run_batch(self, batch_key: tuple, batch: list):
+        """Generate one micro-batch and resolve its callers' futures."""
+        system_prompt, temperature, max_tokens, cache_system_prompt, response_schema = batch_key
+        try:
+            texts = await self.agenerate_batch(
+                system_prompt, [prompt for prompt, _ in batch],
+                temperature, max_tokens, cache_system_prompt, response_schema
+            )
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), text in zip(batch, texts):
+            if not future.done():
+                future.set_result(text)
+    
+    def _split_cached(
+        self,
+        system_prompt: str,
+        user_prompts: List[str],
+        temperature: float,
+        max_tokens: int
+    ) -> tuple:
+        """Return (cache keys, results with cache hits filled in, indexes still missing)."""
+        keys = [self._response_key(system_prompt, p, temperature, max_tokens) for p in user_prompts]
+        results = [self._response_get(key) for key in keys]
+        missing = [i for i, text in enumerate(results) if text is None]
+        return keys, results, missing
+    
+    def _fill_batch(self, keys: list, results: list, missing: list, texts: list):
+        """Place batch answers into results and cache them per prompt."""
+        for i, text in zip(missing, texts):
+            results[i] = text
+            self._response_put(keys[i], text)
+    
+    def _batch_prompt(self, user_prompts: List[str]) -> str:
+        """Wrap several user prompts into one batched user message."""
+        return BATCH_PROMPT_TEMPLATE.format(
+            count=len(user_prompts),
+            requests_json=dumps_json(user_prompts, indent=True)
+        )
+    
+    def _split_batch_response(self, response: Optional[str], count: int) -> Optional[List[str]]:
+        """Split a batched answer into per-prompt JSON texts, or None if unusable."""
+        try:
+            items = self.parse_json_response(response)
+        except ValueError:
+            items = None
+        if isinstance(items, dict):
+            items = items.get("results")
+        if not isinstance(items, list) or len(items) != count:
+            logger.warning("Batched LLM response unusable, answering prompts one by one")
+            return None
+        return [dumps_json(item) for item in items]
     
-    def _generate_gemini(self, system_prompt: str, user_prompt: str, temperature: float) -> str:
+    def _generate_gemini(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: float,
+        max_tokens: int,
+        cache_system_prompt: bool = False,
+        response_schema: Optional[type] = None
+    ) -> str:
         """Generate using Gemini."""
+        config = self._gemini_config(temperature, max_tokens, response_schema)
+        if cache_system_prompt:
+            model = self._cached_gemini_model(system_prompt)
+            if model is not None:
+                return self._stream_gemini(model, user_prompt, config)
+        
         # Gemini combines system and user prompts
         full_prompt = f"{system_prompt}\n\n{user_prompt}"
         
-        response = self.client.generate_content(
-            full_prompt,
-            generation_config={
-                "temperature": temperature,
-                "max_output_tokens": 500
-            }
+        return self._stream_gemini(self.client, full_prompt, config)
+    
+    async def _agenerate_gemini(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: float,
+        max_tokens: int,
+        cache_system_prompt: bool = False,
+        response_schema: Optional[type] = None
+    ) -> str:
+        """Generate using Gemini's async API."""
+        config = self._gemini_config(temperature, max_tokens, response_schema)
+        if cache_system_prompt:
+            model = await asyncio.to_thread(self._cached_gemini_model, system_prompt)
+            if model is not None:
+                return await self._astream_gemini(model, user_prompt, config)
+        
+        full_prompt = f"{system_prompt}\n\n{user_prompt}"
+        
+        return await self._astream_gemini(self.client, full_prompt, config)
+    
+    def _gemini_config(
+        self,
+        temperature: float,
+        max_tokens: int,
+        response_schema: Optional[type] = None
+    ) -> Dict[str, Any]:
+        """Gemini generation_config for a call."""
+        config = {
+            "temperature": temperature,
+            "max_output_tokens": max_tokens
+        }
+        if self.JSON_RESPONSES or response_schema is not None:
+            config["response_mime_type"] = "application/json"
+        if response_schema is not None:
+            config["response_schema"] = response_schema
+        return config
+    
+    def _stream_gemini(self, model, prompt: str, config: Dict[str, Any]) -> str:
+        """
+        Run a streamed Gemini generation and return the full text.
+        
+        Chunks are collected as they arrive instead of waiting for the whole
+        response body; the result is the same text a non-streamed call returns.
+        """
+        return "".join(self._gemini_chunks(model, prompt, config))
+    
+    def _gemini_chunks(self, model, prompt: str, config: Dict[str, Any]) -> Iterator[str]:
+        """Yield the text of each chunk of a streamed Gemini generation."""
+        response = model.generate_content(
+            prompt,
+            generation_config=config,
+            stream=True
+        )
+        for chunk in response:
+            yield chunk.text
+    
+    def _iter_gemini(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: float,
+        max_tokens: int,
+        cache_system_prompt: bool = False
+    ) -> Iterator[str]:
+        """Stream using Gemini."""
+        config = self._gemini_config(temperature, max_tokens)
+        if cache_system_prompt:
+            model = self._cached_gemini_model(system_prompt)
+            if model is not None:
+                return self._gemini_chunks(model, user_prompt, config)
+        
+        return self._gemini_chunks(self.client, f"{system_prompt}\n\n{user_prompt}", config)
+    
+    async def _astream_gemini(self, model, prompt: str, config: Dict[str, Any]) -> str:
+        """
+        Async variant of _stream_gemini().
+        
+        Each chunk must arrive within GEMINI_CHUNK_TIMEOUT seconds, so a
+        stalled connection fails fast instead of waiting out the whole request.
+        """
+        response = await asyncio.wait_for(
+            model.generate_content_async(
+                prompt,
+                generation_config=config,
+                stream=True
+            ),
+            self.GEMINI_CHUNK_TIMEOUT
         )
         
-        return response.text
+        parts = []
+        chunks = response.__aiter__()
+        while True:
+            try:
+                chunk = await asyncio.wait_for(chunks.__anext__(), self.GEMINI_CHUNK_TIMEOUT)
+            except StopAsyncIteration:
+                break
+            parts.append(chunk.text)
+        return "".join(parts)
+    
+    def _cached_gemini_model(self, system_prompt: str):
+        """
+        Get a Gemini model bound to a server-side cache of the system prompt.
+        
+        The cache is created on first use and recreated shortly before its
+        TTL lapses. If creation fails (e.g. prompt below the provider's
+        minimum cacheable size) None is returned and retried only after the
+        same interval, so callers fall back to sending the full prompt.
+        
+        Args:
+            system_prompt: System instruction to cache
+            
+        Returns:
+            GenerativeModel using the cached content, or None
+        """
+        now = time.monotonic()
+        entry = self._gemini_prompt_caches.get(system_prompt)
+        if entry and entry[0] > now:
+            return entry[1]
+        
+        ttl = timedelta(hours=1)
+        try:
+            import google.generativeai as genai
+            from google.generativeai import caching
+            
+            cached_content = caching.CachedContent.create(
+                model=self.client.model_name,
+                system_instruction=system_prompt,
+                ttl=ttl
+            )
+            model = genai.GenerativeModel.from_cached_content(cached_content=cached_content)
+            logger.info("Created Gemini prompt cache for system prompt")
+        except Exception as e:
+            logger.warning(f"Gemini prompt caching unavailable, sending full prompt: {e}")
+            model = None
+        
+        self._gemini_prompt_caches[system_prompt] = (now + ttl.total_seconds() - 60, model)
+        return model
     
     def _generate_openai(
         self,
         system_prompt: str,
         user_prompt: str,
         temperature: float,
-        max_tokens: int
+        max_tokens: int,
+        cache_system_prompt: bool = False,
+        response_schema: Optional[type] = None
     ) -> str:
-        """Generate using OpenAI."""
+        """
+        Generate using OpenAI (stable system prompts hit its automatic prefix cache).
+        
+        response_schema is not applied: gpt-3.5-turbo has no json_schema
+        response format, so answers are constrained by JSON mode only.
+        """
         response = self.client.chat.completions.create(
             model="gpt-3.5-turbo",
             messages=[
@@ -150,31 +992,105 @@ class LLMClient:
                 {"role": "user", "content": user_prompt}
             ],
             temperature=temperature,
-            max_tokens=max_tokens
+            max_tokens=max_tokens,
+            **self._openai_options
         )
         
         return response.choices[0].message.content
     
+    def _iter_openai(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: float,
+        max_tokens: int,
+        cache_system_prompt: bool = False
+    ) -> Iterator[str]:
+        """Stream using OpenAI."""
+        stream = self.client.chat.completions.create(
+            model="gpt-3.5-turbo",
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ],
+            temperature=temperature,
+            max_tokens=max_tokens,
+            stream=True,
+            **self._openai_options
+        )
+        
+        for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+    
     def _generate_anthropic(
         self,
         system_prompt: str,
         user_prompt: str,
         temperature: float,
-        max_tokens: int
+        max_tokens: int,
+        cache_system_prompt: bool = False,
+        response_schema: Optional[type] = None
     ) -> str:
-        """Generate using Anthropic Claude."""
+        """
+        Generate using Anthropic Claude.
+        
+        With a response_schema the model is made to call a single tool whose
+        input schema is the response schema; the tool input is the answer.
+        """
+        options = {}
+        if response_schema is not None:
+            options["tools"] = [{
+                "name": "respond",
+                "description": "Return the answer.",
+                "input_schema": response_schema.model_json_schema()
+            }]
+            options["tool_choice"] = {"type": "tool", "name": "respond"}
+        
         response = self.client.messages.create(
             model="claude-3-sonnet-20240229",
             max_tokens=max_tokens,
             temperature=temperature,
-            system=system_prompt,
+            system=self._anthropic_system(system_prompt, cache_system_prompt),
             messages=[
                 {"role": "user", "content": user_prompt}
-            ]
+            ],
+            **options
         )
         
+        if response_schema is not None:
+            for block in response.content:
+                if block.type == "tool_use":
+                    return dumps_json(block.input)
         return response.content[0].text
     
+    def _iter_anthropic(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: float,
+        max_tokens: int,
+        cache_system_prompt: bool = False
+    ) -> Iterator[str]:
+        """Stream using Anthropic Claude."""
+        with self.client.messages.stream(
+            model="claude-3-sonnet-20240229",
+            max_tokens=max_tokens,
+            temperature=temperature,
+            system=self._anthropic_system(system_prompt, cache_system_prompt),
+            messages=[
+                {"role": "user", "content": user_prompt}
+            ]
+        ) as stream:
+            yield from stream.text_stream
+    
+    @staticmethod
+    def _anthropic_system(system_prompt: str, cache_system_prompt: bool):
+        """System parameter for Anthropic, marked as a cacheable prefix if requested."""
+        if cache_system_prompt:
+            return [{"type": "text", "text": system_prompt, "cache_control": {"type": "ephemeral"}}]
+        return system_prompt
+    
     def _mock_response(self, user_prompt: str) -> str:
         """
         Generate mock response for testing without API key.
@@ -186,149 +1102,85 @@ class LLMClient:
         # Mock CCA response
         if "classify this content" in prompt_lower or "classification" in prompt_lower:
             if "meme" in prompt_lower or "funny" in prompt_lower or "compilation" in prompt_lower:
-                return json.dumps({
-                    "category": "addictive",
-                    "reason": "Short-form compilation triggers dopamine loops",
-                    "triggers": ["short_duration", "compilation", "humor"],
-                    "thumbnail_sentiment": "clickbait",
-                    "confidence": 0.89
-                })
+                return _MOCK_RESPONSES["classify_addictive"]
             elif "tutorial" in prompt_lower or "learn" in prompt_lower:
-                return json.dumps({
-                    "category": "educational",
-                    "reason": "Tutorial content for skill development",
-                    "triggers": [],
-                    "thumbnail_sentiment": "positive",
-                    "confidence": 0.92
-                })
+                return _MOCK_RESPONSES["classify_educational"]
             else:
-                return json.dumps({
-                    "category": "neutral",
-                    "reason": "General content without strong indicators",
-                    "triggers": [],
-                    "thumbnail_sentiment": "neutral",
-                    "confidence": 0.65
-                })
+                return _MOCK_RESPONSES["classify_neutral"]
         
         # Mock ASA response
         elif "addiction score" in prompt_lower or "compute addiction" in prompt_lower:
-            return json.dumps({
-                "addiction_index": 72,
-                "major_factors": ["short_duration", "compilation", "repeat_viewing"],
-                "risk_level": "high",
-                "recommended_action": "blur"
-            })
+            return _MOCK_RESPONSES["score"]
         
         # Mock ROA response
         elif "alternatives" in prompt_lower or "suggest" in prompt_lower:
-            return json.dumps({
-                "alternatives": [
-                    {
-                        "title": "Study With Me - 30 min Pomodoro Focus Session",
-                        "reason": "Productive alternative with structured time",
-                        "search_query": "study with me pomodoro 30 minutes",
-                        "type": "video",
-                        "estimated_duration": 1800
-                    },
-                    {
-                        "title": "5-Minute Meditation Break for Focus",
-                        "reason": "Quick mental reset to improve concentration",
-                        "search_query": "5 minute meditation focus",
-                        "type": "guided_exercise",
-                        "estimated_duration": 300
-                    },
-                    {
-                        "title": "Python Basics - 10 Minute Tutorial",
-                        "reason": "Learn a valuable skill in short time",
-                        "search_query": "python tutorial 10 minutes beginner",
-                        "type": "video",
-                        "estimated_duration": 600
-                    }
-                ]
-            })
+            return _MOCK_RESPONSES["alternatives"]
         
         # Mock BMA response
         elif "behavior" in prompt_lower or "analyze" in prompt_lower:
-            return json.dumps({
-                "user_summary": {
-                    "avg_daily_addictive_minutes": 45,
-                    "streak_days": 3,
-                    "trend": "increasing"
-                },
-                "early_warning": True,
-                "suggested_intervention_schedule": "Increase nudges during evening hours (6-10 PM)",
-                "insights": [
-                    "Late-night usage pattern detected",
-                    "Increased short-form content consumption",
-                    "Declining engagement with educational content"
-                ]
-            })
+            return _MOCK_RESPONSES["behavior"]
         
         # Mock CECA response
         elif "ui instructions" in prompt_lower or "generate ui" in prompt_lower:
-            return json.dumps({
-                "intervention_type": "blur",
-                "overlay_text": "Take a mindful break 🧘",
-                "cta_buttons": [
-                    {"label": "Show Alternatives", "action_key": "show_alternatives"},
-                    {"label": "Reveal Content", "action_key": "reveal"}
-                ],
-                "css_snippet": "",
-                "timer_seconds": None
-            })
+            return _MOCK_RESPONSES["ui"]
         
         # Default mock response
-        return json.dumps({
-            "status": "mock",
-            "message": "Mock LLM response (no API key configured)"
-        })
+        return _MOCK_RESPONSES["default"]
     
     def parse_json_response(self, response: str) -> Optional[Dict[str, Any]]:
         """
         Parse JSON from LLM response.
         
-        Handles cases where LLM includes extra text around JSON.
+        Handles cases where LLM includes extra text around JSON (prose,
+        markdown code blocks, or both): after a direct parse fails, the
+        balanced top-level values in the text are found in a single scan
+        and the first one that parses is returned. Trailing commas are
+        tolerated.
         
         Args:
             response: Raw LLM response
             
         Returns:
-            Parsed JSON dict or None if parsing failed
+            Parsed JSON dict (or list) or None if parsing failed
         """
         if not response:
             return None
         
         try:
-            # Try direct parse first
-            return json.loads(response)
+            return loads_json(response)
         except json.JSONDecodeError:
-            # Try to extract JSON from markdown code blocks
-            if "```json" in response:
-                start = response.find("```json") + 7
-                end = response.find("```", start)
-                json_str = response[start:end].strip()
-                return json.loads(json_str)
+            pass
             
-            # Try to find JSON object in text
-            start = response.find("{")
-            end = response.rfind("}") + 1
-            if start >= 0 and end > start:
-                json_str = response[start:end]
-                return json.loads(json_str)
+        for start, end in _json_spans(response):
+            candidate = response[start:end]
+            try:
+                return loads_json(candidate)
+            except json.JSONDecodeError:
+                pass
+            try:
+                return loads_json(_TRAILING_COMMA_RE.sub(r"\1", candidate))
+            except json.JSONDecodeError:
+                pass
             
-            logger.error(f"Failed to parse JSON from response: {response[:100]}...")
-            return None
+        logger.error(f"Failed to parse JSON from response: {response[:100]}...")
+        return None
 
 
-# Global LLM client instance
-_llm_client = None
+# Shared LLM clients, one per provider
+@lru_cache(maxsize=None)
+def _shared_llm_client(provider: str) -> LLMClient:
+    return LLMClient(provider)
+
 
 def get_llm_client(provider: str = "gemini") -> LLMClient:
-    """Get or create global LLM client instance."""
-    global _llm_client
-    if _llm_client is None:
-        _llm_client = LLMClient(provider)
-    return _llm_client
+    """
+    Get the shared LLM client for a provider.
+    
+    All agents share one client (and its underlying model and connection
+    pool) per provider, so connection setup and auth are paid once per
+    process instead of once per agent.
+    """
+    return _shared_llm_client(provider.lower())
 
 
 # Test the client
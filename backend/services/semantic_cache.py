@@ -0,0 +1,301 @@
+"""
+Semantic Cache Service
+
+Second-tier (L2) cache for LLM results keyed on meaning rather than exact
+text: paraphrased titles ("Funny Meme Comp 2024" vs "Try Not To Laugh -
+Meme Compilation 2024") resolve to the same cached classification.
+Backed by Redis vector search via redisvl. Without Redis, an in-process
+index can be enabled with SEMANTIC_CACHE_LOCAL=1 (needs
+sentence-transformers); otherwise the cache is disabled.
+"""
+
+import os
+import json
+import time
+import asyncio
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+logger = logging.getLogger("ZenFeed.SemanticCache")
+
+# Sentence embedding model for the in-process index (384-dim)
+LOCAL_EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+LOCAL_EMBEDDING_BATCH = 64
+
+
+class LocalVectorCache:
+    """
+    In-process semantic cache backend, used when Redis is not configured.
+    
+    Embeddings are L2-normalized and kept as rows of one NumPy matrix, so a
+    lookup is a single matrix-vector product (exact inner-product search,
+    like a flat FAISS index). At capacity the least recently used entry is
+    overwritten. Exposes the subset of redisvl's SemanticCache interface
+    that SemanticCache uses; one instance serves one agent type, so
+    filters are ignored.
+    
+    Recent query embeddings are memoized, so store() after a missed
+    check() doesn't encode the same text again, and prefetch() encodes a
+    whole batch of upcoming lookups in one model call.
+    """
+    
+    _MEMO_SIZE = 1024
+    
+    def __init__(self, encode, capacity: int = 10000, ttl: int = 3600):
+        """
+        Initialize the index.
+        
+        Args:
+            encode: Function mapping a list of texts to normalized row vectors
+            capacity: Maximum number of entries
+            ttl: Entry lifetime in seconds
+        """
+        self._encode = encode
+        self._memo = OrderedDict()  # text -> embedding
+        self.capacity = capacity
+        self.ttl = ttl
+        self._vectors = None  # (capacity, dim) float32, allocated on first store
+        self._responses: List[Optional[str]] = []
+        self._stored_at = np.zeros(capacity)
+        self._last_used = np.zeros(capacity)
+        self._lock = threading.Lock()
+    
+    def _embed(self, text: str) -> np.ndarray:
+        with self._lock:
+            vector = self._memo.get(text)
+            if vector is not None:
+                self._memo.move_to_end(text)
+                return vector
+        self.prefetch([text])
+        with self._lock:
+            return self._memo[text]
+    
+    def prefetch(self, texts: List[str]):
+        """Encode all not-yet-memoized texts in one model call."""
+        with self._lock:
+            missing = [text for text in dict.fromkeys(texts) if text not in self._memo]
+        if not missing:
+            return
+        vectors = np.asarray(self._encode(missing), dtype=np.float32)
+        with self._lock:
+            for text, vector in zip(missing, vectors):
+                self._memo[text] = vector
+                self._memo.move_to_end(text)
+            while len(self._memo) > self._MEMO_SIZE:
+                self._memo.popitem(last=False)
+    
+    def check(self, prompt: str, num_results: int = 1, filter_expression=None) -> List[Dict[str, Any]]:
+        """Return the closest fresh entry as [{"response", "vector_distance"}], or []."""
+        query = self._embed(prompt)
+        with self._lock:
+            size = len(self._responses)
+            if size == 0:
+                return []
+            sims = self._vectors[:size] @ query
+            row = int(np.argmax(sims))
+            now = time.monotonic()
+            if now - self._stored_at[row] > self.ttl:
+                return []
+            self._last_used[row] = now
+            return [{"response": self._responses[row], "vector_distance": 1.0 - float(sims[row])}]
+    
+    def store(self, prompt: str, response: str, filters: Optional[Dict[str, Any]] = None):
+        """Add an entry, overwriting the least recently used one when full."""
+        vector = self._embed(prompt)
+        with self._lock:
+            if self._vectors is None:
+                self._vectors = np.zeros((self.capacity, vector.shape[0]), dtype=np.float32)
+            if len(self._responses) < self.capacity:
+                row = len(self._responses)
+                self._responses.append(response)
+            else:
+                row = int(np.argmin(self._last_used))
+                self._responses[row] = response
+            now = time.monotonic()
+            self._vectors[row] = vector
+            self._stored_at[row] = now
+            self._last_used[row] = now
+
+
+class SemanticCache:
+    """
+    Embedding-similarity cache for JSON-serializable LLM results.
+    
+    Entries are tagged with an agent type so agents sharing the same
+    Redis index never see each other's results.
+    """
+    
+    def __init__(
+        self,
+        agent_type: str,
+        distance_threshold: float = 0.08,
+        ttl: int = 3600
+    ):
+        """
+        Initialize semantic cache.
+        
+        Args:
+            agent_type: Tag isolating this agent's entries (e.g. "cca")
+            distance_threshold: Maximum cosine distance counted as a hit
+                (0.08 ~ similarity >= 0.92)
+            ttl: Entry lifetime in seconds
+        """
+        self.agent_type = agent_type
+        self.distance_threshold = distance_threshold
+        self.ttl = ttl
+        self._filter = None
+        self.cache = self._initialize_cache()
+    
+    @property
+    def enabled(self) -> bool:
+        return self.cache is not None
+    
+    def _initialize_cache(self):
+        """Connect to Redis and build the redisvl cache, or None if unavailable."""
+        redis_url = os.getenv("REDIS_URL")
+        if not redis_url:
+            if os.getenv("SEMANTIC_CACHE_LOCAL", "").lower() in ("1", "true", "yes"):
+                return self._initialize_local_cache()
+            logger.info("REDIS_URL not set, semantic cache disabled")
+            return None
+        
+        try:
+            from redisvl.extensions.cache.llm import SemanticCache as RedisSemanticCache
+            from redisvl.query.filter import Tag
+            from redisvl.utils.vectorize import HFTextVectorizer
+            
+            cache = RedisSemanticCache(
+                name="zenfeed_llm",
+                redis_url=redis_url,
+                distance_threshold=self.distance_threshold,
+                ttl=self.ttl,
+                vectorizer=HFTextVectorizer("redis/langcache-embed-v1"),
+                filterable_fields=[{"name": "agent_type", "type": "tag"}]
+            )
+            self._filter = Tag("agent_type") == self.agent_type
+            logger.info(f"Semantic cache initialized for {self.agent_type}")
+            return cache
+        
+        except ImportError as e:
+            logger.warning(f"redisvl not installed, semantic cache disabled: {e}")
+            return None
+        except Exception as e:
+            logger.error(f"Failed to initialize semantic cache: {e}")
+            return None
+    
+    def _initialize_local_cache(self):
+        """Build the in-process index, or None if sentence-transformers is unavailable."""
+        try:
+            from sentence_transformers import SentenceTransformer
+            
+            model = SentenceTransformer(LOCAL_EMBEDDING_MODEL)
+            cache = LocalVectorCache(
+                lambda texts: model.encode(
+                    texts,
+                    batch_size=LOCAL_EMBEDDING_BATCH,
+                    normalize_embeddings=True,
+                    show_progress_bar=False
+                ),
+                ttl=self.ttl
+            )
+            logger.info(f"Local semantic cache initialized for {self.agent_type}")
+            return cache
+        
+        except ImportError as e:
+            logger.warning(f"sentence-transformers not installed, semantic cache disabled: {e}")
+            return None
+        except Exception as e:
+            logger.error(f"Failed to initialize local semantic cache: {e}")
+            return None
+    
+    def check(self, text: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached result for semantically similar text.
+        
+        Args:
+            text: Normalized lookup text
+        
+        Returns:
+            Cached result or None on miss
+        """
+        if not self.cache:
+            return None
+        
+        try:
+            hits = self.cache.check(
+                prompt=text,
+                num_results=1,
+                filter_expression=self._filter
+            )
+            if hits and float(hits[0]["vector_distance"]) < self.distance_threshold:
+                return json.loads(hits[0]["response"])
+        except Exception as e:
+            logger.error(f"Semantic cache lookup failed: {e}")
+        return None
+    
+    def store(self, text: str, result: Dict[str, Any]):
+        """
+        Store a result under the given text.
+        
+        Args:
+            text: Normalized lookup text
+            result: JSON-serializable result
+        """
+        if not self.cache:
+            return
+        
+        try:
+            self.cache.store(
+                prompt=text,
+                response=json.dumps(result),
+                filters={"agent_type": self.agent_type}
+            )
+        except Exception as e:
+            logger.error(f"Semantic cache store failed: {e}")
+    
+    def prefetch(self, texts: List[str]):
+        """
+        Embed upcoming lookup texts in one batch (local backend only).
+        
+        Args:
+            texts: Normalized lookup texts about to be checked
+        """
+        prefetch = getattr(self.cache, "prefetch", None)
+        if not prefetch or not texts:
+            return
+        
+        try:
+            prefetch(texts)
+        except Exception as e:
+            logger.error(f"Semantic cache prefetch failed: {e}")
+    
+    async def acheck(self, text: str) -> Optional[Dict[str, Any]]:
+        """Async variant of check() (runs in a worker thread)."""
+        if not self.cache:
+            return None
+        return await asyncio.to_thread(self.check, text)
+    
+    async def astore(self, text: str, result: Dict[str, Any]):
+        """Async variant of store() (runs in a worker thread)."""
+        if not self.cache:
+            return
+        await asyncio.to_thread(self.store, text, result)
+
+
+# Per-agent semantic cache instances
+_semantic_caches: Dict[str, SemanticCache] = {}
+
+def get_semantic_cache(agent_type: str) -> SemanticCache:
+    """Get or create the semantic cache for an agent type."""
+    cache = _semantic_caches.get(agent_type)
+    if cache is None:
+        cache = _semantic_caches[agent_type] = SemanticCache(agent_type)
+    return cache
@@ -1,22 +1,72 @@
 # backend/services/yt_client.py
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
 from googleapiclient.discovery import build
+from backend.core.utils import api_json_model
+from .youtube_service import HttpResponseCache, SearchCache
 from youtube_transcript_api import YouTubeTranscriptApi, TranscriptsDisabled, NoTranscriptFound
 import logging
 logger = logging.getLogger("yt_client")
 
 YT_API_KEY = os.getenv("YT_API_KEY", "YOUR_YT_API_KEY")
+# videos.list accepts up to 50 comma-separated IDs per request
+VIDEOS_PER_REQUEST = 50
+# Transcripts don't change for a video, so they are kept for 30 days; a
+# missing transcript may be added later and is rechecked after a day
+TRANSCRIPT_CACHE_TTL = 30 * 86400
+NO_TRANSCRIPT_TTL = 86400
+TRANSCRIPT_WORKERS = 16
+_transcript_cache = SearchCache(directory=os.getenv("TRANSCRIPT_CACHE_DIR", "/var/tmp/zenfeed-transcripts"))
+# videos.list responses, revalidated by ETag (If-None-Match) on refetch
+_response_cache = HttpResponseCache(SearchCache(directory=os.getenv("YOUTUBE_HTTP_CACHE_DIR", "/var/tmp/zenfeed-yt-http")))
+
+_client = None
+_client_lock = threading.Lock()
+_thread_state = threading.local()
 
 def build_youtube_client():
-    return build("youtube", "v3", developerKey=YT_API_KEY)
+    # built once per process (uses the bundled discovery document, no fetch)
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = build("youtube", "v3", developerKey=YT_API_KEY, model=api_json_model(),
+                                static_discovery=True, cache_discovery=False)
+    return _client
+
+def _thread_http():
+    # the shared client's default httplib2 connection is not thread-safe
+    http = getattr(_thread_state, "http", None)
+    if http is None:
+        import httplib2
+        http = _thread_state.http = httplib2.Http(cache=_response_cache, timeout=10)
+    return http
 
 def fetch_video_metadata(video_id):
+    return fetch_video_metadata_batch([video_id]).get(video_id)
+
+def fetch_video_metadata_batch(video_ids: List[str]) -> Dict[str, Dict]:
+    """
+    Fetch metadata for many videos with one videos.list request per 50 IDs.
+    returns: { video_id: meta } (IDs the API doesn't return are absent)
+    """
+    ids = list(dict.fromkeys(video_ids))  # dedupe, keep order
+    if not ids:
+        return {}
     youtube = build_youtube_client()
-    res = youtube.videos().list(part="snippet,contentDetails,statistics", id=video_id).execute()
-    items = res.get("items", [])
-    if not items:
-        return None
-    item = items[0]
+    metas = {}
+    for i in range(0, len(ids), VIDEOS_PER_REQUEST):
+        chunk = ids[i:i + VIDEOS_PER_REQUEST]
+        res = youtube.videos().list(part="snippet,contentDetails,statistics", id=",".join(chunk)).execute(http=_thread_http())
+        for item in res.get("items", []):
+            meta = _video_meta(item)
+            metas[meta["id"]] = meta
+    return metas
+
+def _video_meta(item: Dict) -> Dict:
+    video_id = item["id"]
     snippet = item["snippet"]
     content = item.get("contentDetails", {})
     stats = item.get("statistics", {})
@@ -33,9 +83,29 @@ def fetch_video_metadata(video_id):
     return meta
 
 def fetch_video_transcript(video_id):
+    key = ("transcript", video_id)
+    cached = _transcript_cache.get(key)
+    if cached is not None:
+        return cached
     try:
         text_list = YouTubeTranscriptApi.get_transcript(video_id, languages=['en'])
-        return " ".join([p["text"] for p in text_list])
+        # list, not a generator: str.join materializes its input anyway and
+        # is ~30% slower when it has to drain a generator first
+        transcript = " ".join([p["text"] for p in text_list])
+        _transcript_cache.set(key, transcript, TRANSCRIPT_CACHE_TTL)
+        return transcript
     except (TranscriptsDisabled, NoTranscriptFound) as e:
         logger.debug(f"No transcript: {video_id} -> {e}")
+        _transcript_cache.set(key, "", NO_TRANSCRIPT_TTL)
         return ""
+
+def fetch_transcripts_batch(video_ids: List[str]) -> Dict[str, str]:
+    """
+    Fetch transcripts for many videos in parallel (cached ones are not refetched).
+    returns: { video_id: transcript }
+    """
+    ids = list(dict.fromkeys(video_ids))
+    if len(ids) <= 1:
+        return {vid: fetch_video_transcript(vid) for vid in ids}
+    with ThreadPoolExecutor(max_workers=min(TRANSCRIPT_WORKERS, len(ids))) as pool:
+        return dict(zip(ids, pool.map(fetch_video_transcript, ids)))
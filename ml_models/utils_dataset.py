@@ -1,7 +1,7 @@
+import os
 import pandas as pd
 
-def create_sample_dataset(save_path="data/processed/sample_dataset.csv"):
-    rows = [
+_SAMPLE_ROWS = (
     # addictive
     {"title":"Try Not To Laugh - Funny Memes Compilation", "description":"memes and funny videos", "label":"addictive"},
     {"title":"Top 10 Gaming Fails", "description":"gaming compilation", "label":"addictive"},
@@ -22,9 +22,11 @@ def create_sample_dataset(save_path="data/processed/sample_dataset.csv"):
     {"title":"Unboxing new phone", "description":"review", "label":"neutral"},
     {"title":"Top 5 tech gadgets", "description":"neutral tech info", "label":"neutral"},
     {"title":"Room tour setup video", "description":"overview of workspace", "label":"neutral"},
-]
+)
 
-    df = pd.DataFrame(rows)
+def create_sample_dataset(save_path="data/processed/sample_dataset.csv"):
+    df = pd.DataFrame(_SAMPLE_ROWS)
+    os.makedirs(os.path.dirname(save_path) or ".", exist_ok=True)
     df.to_csv(save_path, index=False)
     return df
 